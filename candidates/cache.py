@@ -0,0 +1,113 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .search import get_search_backend, query_terms
+
+
+VERSION_KEY = 'candidates:version'
+
+
+def get_search_cache():
+    """
+    Returns the cache configured in `CANDIDATE_SEARCH['CACHE']`, or None when caching is disabled.
+    """
+    alias = getattr(settings, 'CANDIDATE_SEARCH', {}).get('CACHE')
+    return caches[alias] if alias else None
+
+
+def get_version_cache():
+    """
+    Returns the cache holding the candidate table version. It lives next to the
+    search results so that a shared cache backend also shares invalidation.
+    """
+    return get_search_cache() or caches['default']
+
+
+def get_candidates_version():
+    """
+    Returns the current candidate table version, bumped on every write.
+    """
+    version_cache = get_version_cache()
+    version = version_cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock rather than 1, so a version that was evicted from the
+        # cache can never be reused while results cached under it are still alive.
+        version_cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = version_cache.get(VERSION_KEY)
+    return version
+
+
+def bump_candidates_version():
+    """
+    Invalidates everything cached for the current version, e.g. after candidates
+    are written outside `Model.save()`/`delete()` such as by `bulk_create`.
+    Inside a transaction the version is bumped again on commit, so a search
+    racing the transaction cannot cache pre-commit rows under the new version.
+    """
+    increment_version()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(increment_version)
+
+
+def increment_version():
+    version_cache = get_version_cache()
+    try:
+        version_cache.incr(VERSION_KEY)
+    except ValueError:
+        # The version was evicted; a fresh clock-based one invalidates old keys too.
+        get_candidates_version()
+
+
+def search_digest(validated_data):
+    """
+    Hashes a validated search request. Queries share a digest when they have the
+    same terms, in any order, as the active search backend matches them: terms
+    are normalized (casefolded, accent-stripped) unless the backend matches the
+    raw query.
+    """
+    backend = get_search_backend()
+    query = validated_data['q']
+    if backend.normalizes_query or validated_data.get('fuzzy'):
+        terms = sorted(query_terms(query))
+    else:
+        terms = sorted(query.split())
+    params = {
+        'backend': backend.name,
+        'terms': terms,
+        **{field: value for field, value in validated_data.items() if field != 'q'},
+    }
+    return hashlib.md5(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def search_cache_key(validated_data, version=None):
+    """
+    Builds the cache key for a validated search request. The key embeds the
+    candidate table version.
+    """
+    return f'candidates:search:{version or get_candidates_version()}:{search_digest(validated_data)}'
+
+
+# Search parameters selecting a page of the results, rather than the matched candidates.
+PAGE_PARAMS = ('page', 'page_size', 'pagination', 'cursor', 'count', 'facets')
+
+
+def facets_cache_key(validated_data, version=None):
+    """
+    Builds the cache key for the facet counts of a validated search request.
+    They only depend on the matched candidates, so every page of a search shares them.
+    """
+    matched = {field: value for field, value in validated_data.items() if field not in PAGE_PARAMS}
+    return f'candidates:facets:{version or get_candidates_version()}:{search_digest(matched)}'
+
+
+def search_etag(validated_data, version=None):
+    """
+    Builds the weak entity tag of a search response: it changes with every
+    candidate write, whether or not the write affects these results.
+    """
+    return f'W/"{version or get_candidates_version()}-{search_digest(validated_data)}"'
@@ -0,0 +1,282 @@
+"""
+Database-backed queue of background candidate jobs.
+
+Jobs are CandidateJob rows queued by the jobs API. `run_candidate_worker`
+claims due jobs (`claim_job`), at most KIND_CONCURRENCY[kind] of a kind running
+at once across workers, and runs them in a thread pool (`run_job`). Handlers
+report progress through their JobContext, which raises JobCancelled once
+cancellation is requested. Failed jobs are retried with exponential backoff up
+to MAX_ATTEMPTS; the jobs of a worker that stopped heartbeating are requeued.
+"""
+import os
+import socket
+import uuid
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .management.commands.load_candidates import Command as LoadCandidatesCommand
+from .models import Candidate, CandidateJob
+from .search import rebuild_search_indexes
+from .serializers import CandidateExportSerializer, CandidateFilterSerializer
+from .utils import retry_on_locked
+from .views import CandidateExportView
+
+
+# Advisory lock key of job claims on PostgreSQL.
+CLAIM_LOCK_ID = 0x6a6f6273
+
+
+class JobCancelled(Exception):
+    """
+    Raised into a running job's handler once its cancellation was requested.
+    """
+
+
+class JobContext:
+    """
+    Handed to job handlers to report progress and notice cancellation.
+    """
+    def __init__(self, job, worker):
+        self.job = job
+        self.worker = worker
+
+    def report(self, progress, total=None):
+        """
+        Records the job's progress; raises JobCancelled once cancellation was requested.
+        """
+        updates = {'progress': progress, 'heartbeat_at': timezone.now()}
+        if total is not None:
+            updates['total'] = total
+        CandidateJob.objects.filter(pk=self.job.pk, worker=self.worker).update(**updates)
+        if CandidateJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled
+
+
+def get_job_settings():
+    return settings.CANDIDATE_JOBS
+
+
+def new_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def job_file(job, name):
+    """
+    Path of a file the job writes (export, checkpoint, error log), in its own directory.
+    """
+    directory = Path(get_job_settings()['FILES_DIR']) / str(job.pk)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / name
+
+
+@retry_on_locked
+def claim_job(worker):
+    """
+    Marks the next due queued job whose kind is below its concurrency limit as
+    running on `worker`, and returns it, or None when there is no such job.
+    """
+    now = timezone.now()
+    with transaction.atomic(savepoint=False):
+        if connection.vendor == 'postgresql':
+            # Serializes claims so two workers cannot both take a kind's last slot.
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_ID])
+        running = dict(
+            CandidateJob.objects.filter(status=CandidateJob.RUNNING)
+            .order_by().values_list('kind').annotate(count=Count('id'))
+        )
+        saturated = [
+            kind for kind, limit in get_job_settings()['KIND_CONCURRENCY'].items() if running.get(kind, 0) >= limit
+        ]
+        job = (
+            CandidateJob.objects.filter(status=CandidateJob.QUEUED, run_after__lte=now)
+            .exclude(kind__in=saturated)
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = CandidateJob.RUNNING
+        job.worker = worker
+        job.attempts += 1
+        job.started_at = job.heartbeat_at = now
+        job.save(update_fields=['status', 'worker', 'attempts', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_job(job, worker):
+    """
+    Runs a claimed job and records its outcome: succeeded with the handler's
+    result, cancelled, queued again for a retry, or failed once out of attempts.
+    Returns the job as stored.
+    """
+    job_settings = get_job_settings()
+    owned = CandidateJob.objects.filter(pk=job.pk, status=CandidateJob.RUNNING, worker=worker)
+    try:
+        result = HANDLERS[job.kind](job, JobContext(job, worker))
+    except JobCancelled:
+        owned.update(status=CandidateJob.CANCELLED, finished_at=timezone.now())
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'
+        if job.attempts < job_settings['MAX_ATTEMPTS']:
+            delay = job_settings['RETRY_DELAY'] * 2 ** (job.attempts - 1)
+            owned.update(
+                status=CandidateJob.QUEUED, worker='', error=error, run_after=timezone.now() + timedelta(seconds=delay)
+            )
+        else:
+            owned.update(status=CandidateJob.FAILED, error=error, finished_at=timezone.now())
+    else:
+        owned.update(status=CandidateJob.SUCCEEDED, result=result, error='', finished_at=timezone.now())
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs():
+    """
+    Recovers the running jobs whose worker stopped heartbeating (e.g. it was
+    killed): queued again, or failed once out of attempts, or cancelled when
+    that was requested. Returns the number of jobs recovered.
+    """
+    job_settings = get_job_settings()
+    now = timezone.now()
+    stale = CandidateJob.objects.filter(
+        status=CandidateJob.RUNNING, heartbeat_at__lt=now - timedelta(seconds=job_settings['HEARTBEAT_TIMEOUT'])
+    )
+    recovered = stale.filter(cancel_requested=True).update(status=CandidateJob.CANCELLED, finished_at=now)
+    recovered += stale.filter(attempts__gte=job_settings['MAX_ATTEMPTS']).update(
+        status=CandidateJob.FAILED, error='Worker lost.', finished_at=now
+    )
+    recovered += stale.update(status=CandidateJob.QUEUED, worker='', error='Worker lost.', run_after=now)
+    return recovered
+
+
+class ImportJobCommand(LoadCandidatesCommand):
+    """
+    `load_candidates` reporting every committed batch to the job.
+    """
+    def __init__(self, context, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.context = context
+
+    def write_batch(self, offset, valid, rejected, size, checkpoint):
+        super().write_batch(offset, valid, rejected, size, checkpoint)
+        self.context.report(offset + size)
+
+
+def run_import(job, context):
+    """
+    Imports an NDJSON or CSV file of IMPORT_DIR. The checkpoint makes a retry
+    resume after the last committed batch.
+    """
+    path = Path(get_job_settings()['IMPORT_DIR']) / job.params['path']
+    error_log = job_file(job, 'errors.ndjson')
+    command = ImportJobCommand(context, stdout=StringIO())
+    call_command(
+        command,
+        str(path),
+        format=job.params.get('format'),
+        workers=get_job_settings()['IMPORT_WORKERS'],
+        checkpoint=str(job_file(job, 'checkpoint')),
+        resume=True,
+        error_log=str(error_log),
+    )
+    return {
+        'inserted': command.inserted,
+        'duplicates': command.duplicates,
+        'rejected': command.rejected,
+        'error_log': str(error_log),
+    }
+
+
+def run_export(job, context):
+    """
+    Writes the candidates, or the search matches, to an NDJSON or CSV file.
+    """
+    export_serializer = CandidateExportSerializer(data=job.params)
+    export_serializer.is_valid(raise_exception=True)
+    validated_data = export_serializer.validated_data
+    batch_size = get_job_settings()['BATCH_SIZE']
+
+    view = CandidateExportView()
+    written = 0
+
+    def rows():
+        nonlocal written
+        for row in view.get_rows(view.get_queryset(validated_data)):
+            yield row
+            written += 1
+            if written % batch_size == 0:
+                context.report(written)
+
+    path = job_file(job, f'candidates.{validated_data["format"]}')
+    pending = path.with_name(path.name + '.tmp')
+    stream = view.stream_csv if validated_data['format'] == 'csv' else view.stream_ndjson
+    with open(pending, 'w', newline='', encoding='utf-8') as handle:
+        handle.writelines(stream(rows()))
+    # Replace atomically so the result never points to a partial file.
+    os.replace(pending, path)
+    context.report(written, written)
+    return {'path': str(path), 'format': validated_data['format'], 'rows': written}
+
+
+def run_reindex(job, context):
+    """
+    Rebuilds the name token index and fuzzy-search vocabulary. A cancelled or
+    failed rebuild leaves them partial until one completes.
+    """
+    context.report(0, Candidate.objects.count())
+    indexed = rebuild_search_indexes(get_job_settings()['BATCH_SIZE'], progress=context.report)
+    return {'indexed': indexed}
+
+
+def run_bulk_delete(job, context):
+    """
+    Deletes the candidates selected by `ids` or `filter` in batches, each in its
+    own transaction, so a long delete never blocks writers for long. Retries
+    continue where the failed attempt stopped.
+    """
+    batch_size = get_job_settings()['BATCH_SIZE']
+    if 'ids' in job.params:
+        ids = sorted(job.params['ids'])
+        batches = (ids[start:start + batch_size] for start in range(0, len(ids), batch_size))
+        total = len(ids)
+    else:
+        queryset = CandidateFilterSerializer.filter_queryset(Candidate.objects.all(), job.params['filter'])
+        batches = filtered_batches(queryset, batch_size)
+        total = queryset.count()
+    context.report(0, total)
+
+    deleted = 0
+    for batch in batches:
+        with transaction.atomic():
+            deleted += Candidate.objects.filter(id__in=batch).delete()[1].get(Candidate._meta.label, 0)
+        context.report(deleted)
+    return {'deleted': deleted}
+
+
+def filtered_batches(queryset, batch_size):
+    """
+    Yields the ids of `queryset` batch_size at a time, walking the primary key.
+    """
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+HANDLERS = {
+    CandidateJob.IMPORT: run_import,
+    CandidateJob.EXPORT: run_export,
+    CandidateJob.REINDEX: run_reindex,
+    CandidateJob.BULK_DELETE: run_bulk_delete,
+}
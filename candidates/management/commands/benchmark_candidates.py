@@ -0,0 +1,265 @@
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from candidates.models import Candidate
+
+
+def percentile(samples, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    index = max(0, min(len(samples) - 1, round(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the candidate API against a seeded fixture database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Candidates in the fixture database (e.g. 10000, 100000, 1000000).')
+        parser.add_argument('--requests', type=int, default=200, help='Requests issued per scenario.')
+        parser.add_argument('--database', help='SQLite fixture file. Defaults to bench_<size>.sqlite3 next to manage.py.')
+        parser.add_argument('--rebuild', action='store_true', help='Recreate the fixture database even if it exists.')
+        parser.add_argument('--output', default='bench_output.json', help='JSON file receiving the results.')
+        parser.add_argument('--baseline', help='Results JSON to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative latency regression vs. the baseline.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix.')
+        parser.add_argument('--threads', type=int, default=8, help='Client threads of the concurrent read/write scenarios.')
+
+    def handle(self, *args, **options):
+        size = options['size']
+        self.rng = random.Random(options['seed'])
+        self.use_fixture_database(options['database'] or settings.BASE_DIR / f'bench_{size}.sqlite3', size, options['rebuild'])
+
+        self.client = Client(HTTP_HOST='localhost')
+        self.candidate_ids = list(Candidate.objects.values_list('id', flat=True)[:5000])
+        self.search_terms = [name.split()[0] for name in Candidate.objects.values_list('name', flat=True)[:5000]]
+
+        count = options['requests']
+        scenarios = {}
+        # Searches bypass the result cache except in the dedicated cached scenario.
+        with override_settings(CANDIDATE_SEARCH={**settings.CANDIDATE_SEARCH, 'CACHE': None}):
+            scenarios['search'] = self.run(count, self.search_request)
+            scenarios['search-cursor'] = self.run(count, lambda: self.search_request(pagination='cursor'))
+            scenarios['search-async'] = self.run(count, lambda: self.search_request(path='/api/async/candidates/search/'))
+            # Searches racing creates, first with SQLite's defaults, then with SQLITE_TUNING.
+            with self.sqlite_profile(tuned=False):
+                scenarios['concurrent-untuned'] = self.run_concurrent(count, options['threads'])
+            scenarios['concurrent'] = self.run_concurrent(count, options['threads'])
+        scenarios['search-cached'] = self.run(count, lambda: self.search_request(term=self.search_terms[0]))
+        scenarios['retrieve'] = self.run(count, self.retrieve_request)
+        scenarios['create'] = self.run(count, self.create_request)
+        scenarios['update'] = self.run(count, self.update_request)
+        scenarios['delete'] = self.run(count, self.delete_request)
+
+        results = {
+            'size': size,
+            'requests': count,
+            'database': connection.vendor,
+            'search_backend': settings.CANDIDATE_SEARCH.get('BACKEND'),
+            'python': platform.python_version(),
+            'scenarios': scenarios,
+        }
+        Path(options['output']).write_text(json.dumps(results, indent=2))
+        self.report(scenarios)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+
+        if options['baseline']:
+            self.compare(scenarios, json.loads(Path(options['baseline']).read_text())['scenarios'], options['tolerance'])
+
+    def use_fixture_database(self, path, size, rebuild):
+        """
+        Points the default connection at a dedicated SQLite file, migrated and
+        seeded to `size` candidates, so benchmarks never touch the real database.
+        """
+        if connection.vendor != 'sqlite':
+            raise CommandError('The fixture database is a SQLite file; run with the SQLite settings.')
+        path = Path(path)
+        if rebuild and path.exists():
+            path.unlink()
+
+        connection.close()
+        connection.settings_dict['NAME'] = str(path)
+        call_command('migrate', verbosity=0)
+
+        missing = size - Candidate.objects.count()
+        if missing > 0:
+            self.stdout.write(self.style.WARNING(f'Seeding {missing} candidates into {path}...'))
+            call_command('seed_candidates', count=missing, fast=True, workers=4, stdout=self.stdout)
+
+    def run(self, count, make_request):
+        """
+        Issues `count` requests and returns latency percentiles, queries per request and throughput.
+        """
+        latencies, queries = [], []
+        started_at = time.perf_counter()
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as captured:
+                request_started_at = time.perf_counter()
+                response = make_request()
+                latencies.append((time.perf_counter() - request_started_at) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{response.request["REQUEST_METHOD"]} {response.request["PATH_INFO"]} returned {response.status_code}.')
+            queries.append(len(captured))
+        elapsed = time.perf_counter() - started_at
+
+        latencies.sort()
+        return {
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'mean_queries': round(statistics.mean(queries), 2),
+            'throughput_rps': round(count / elapsed, 1),
+        }
+
+    def run_concurrent(self, count, threads):
+        """
+        Issues `count` requests from `threads` threads, one create for every four
+        searches, and returns latency percentiles, throughput and failed requests.
+        The created candidates are deleted afterwards.
+        """
+        def worker(requests):
+            client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+            rng = random.Random(self.rng.random())
+            results = []
+            try:
+                for index in range(requests):
+                    request_started_at = time.perf_counter()
+                    if index % 5 == 4:
+                        response = client.post('/api/candidates/', {
+                            'name': f'Concurrent {rng.choice(self.search_terms)}',
+                            'age': rng.randint(20, 50),
+                            'gender': rng.choice('MFO'),
+                            'email': f'benchmark-concurrent-{uuid.uuid4().hex}@example.com',
+                            'phone_number': '1234567890',
+                        })
+                    else:
+                        response = client.get('/api/candidates/search/', {'q': rng.choice(self.search_terms), 'page_size': 100})
+                    results.append(((time.perf_counter() - request_started_at) * 1000, response.status_code))
+            finally:
+                # Every thread opened its own connection.
+                connection.close()
+            return results
+
+        # Failed requests are counted; their tracebacks would flood the report.
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        started_at = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                shares = [count // threads + (index < count % threads) for index in range(threads)]
+                results = [result for results in executor.map(worker, shares) for result in results]
+        finally:
+            request_logger.setLevel(level)
+        elapsed = time.perf_counter() - started_at
+        Candidate.objects.filter(email__startswith='benchmark-concurrent-').delete()
+
+        latencies = sorted(latency for latency, _ in results)
+        return {
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'errors': sum(status_code >= 400 for _, status_code in results),
+            'throughput_rps': round(len(results) / elapsed, 1),
+        }
+
+    @contextmanager
+    def sqlite_profile(self, tuned):
+        """
+        Runs the block on fresh connections using SQLITE_TUNING, or SQLite's
+        defaults (rollback journal, deferred transactions, no lock retries).
+        """
+        options = connection.settings_dict['OPTIONS']
+        saved_options = dict(options)
+        tuning = settings.SQLITE_TUNING
+        if not tuned:
+            options.pop('transaction_mode', None)
+            # The journal mode is stored in the file, so it has to be switched back explicitly.
+            tuning = {'PRAGMAS': {'journal_mode': 'delete'}, 'LOCK_RETRIES': 0}
+
+        connection.close()
+        try:
+            with override_settings(SQLITE_TUNING=tuning):
+                connection.ensure_connection()
+                yield
+        finally:
+            connection.close()
+            options.clear()
+            options.update(saved_options)
+
+    def search_request(self, term=None, pagination='page', path='/api/candidates/search/'):
+        term = term or self.rng.choice(self.search_terms)
+        return self.client.get(path, {'q': term, 'page_size': 100, 'pagination': pagination})
+
+    def retrieve_request(self):
+        return self.client.get(f'/api/candidates/{self.rng.choice(self.candidate_ids)}/')
+
+    def create_request(self):
+        self.created = getattr(self, 'created', [])
+        response = self.client.post('/api/candidates/', {
+            'name': f'Benchmark {self.rng.choice(self.search_terms)}',
+            'age': self.rng.randint(20, 50),
+            'gender': self.rng.choice('MFO'),
+            'email': f'benchmark-{time.time_ns()}@example.com',
+            'phone_number': '1234567890',
+        })
+        if response.status_code == 201:
+            self.created.append(response.json()['id'])
+        return response
+
+    def update_request(self):
+        return self.client.patch(
+            f'/api/candidates/{self.rng.choice(self.candidate_ids)}/',
+            {'age': self.rng.randint(20, 50)},
+            content_type='application/json',
+        )
+
+    def delete_request(self):
+        # Deletes what the create scenario added, keeping the fixture at its size.
+        if not self.created:
+            raise CommandError('The delete scenario needs at least as many requests as the create scenario.')
+        return self.client.delete(f'/api/candidates/{self.created.pop()}/')
+
+    def report(self, scenarios):
+        self.stdout.write(f'{"scenario":<20}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>10}{"req/s":>10}{"errors":>10}')
+        for name, result in scenarios.items():
+            self.stdout.write(
+                f'{name:<20}{result["p50_ms"]:>10}{result["p95_ms"]:>10}{result["p99_ms"]:>10}'
+                f'{result.get("mean_queries", "-"):>10}{result["throughput_rps"]:>10}{result.get("errors", "-"):>10}'
+            )
+
+    def compare(self, scenarios, baseline, tolerance):
+        """
+        Fails when a scenario's p50/p95 latency regressed beyond `tolerance` or it issues more queries.
+        """
+        regressions = []
+        for name, result in scenarios.items():
+            if name not in baseline:
+                continue
+            for metric in ('p50_ms', 'p95_ms'):
+                if result[metric] > baseline[name][metric] * (1 + tolerance):
+                    regressions.append(f'{name} {metric}: {baseline[name][metric]} -> {result[metric]}')
+            if result.get('mean_queries', 0) > baseline[name].get('mean_queries', 0):
+                regressions.append(f'{name} queries: {baseline[name]["mean_queries"]} -> {result["mean_queries"]}')
+            if result.get('errors', 0) > baseline[name].get('errors', 0):
+                regressions.append(f'{name} errors: {baseline[name]["errors"]} -> {result["errors"]}')
+
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS(f'No regressions beyond {tolerance:.0%} against the baseline.'))
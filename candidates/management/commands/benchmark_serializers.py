@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from candidates.models import Candidate
+from candidates.serializers import CandidateReadSerializer, CandidateSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare CandidateSerializer with the CandidateReadSerializer fast path on search-sized pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help='Candidates per serialized page.')
+        parser.add_argument('--iterations', type=int, default=200, help='Pages serialized per serializer.')
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        iterations = options['iterations']
+        queryset = Candidate.objects.order_by('id')[:page_size]
+        if queryset.count() < page_size:
+            raise CommandError(f'Need at least {page_size} candidates; run seed_candidates first.')
+
+        renderer = JSONRenderer()
+        instances = list(queryset)
+        rows = list(CandidateReadSerializer.prepare(queryset))
+
+        # `.all()` gives each run a fresh queryset, so the page is really fetched every time.
+        cases = {
+            'serialize only': (
+                lambda: renderer.render(CandidateSerializer(instances, many=True).data),
+                lambda: renderer.render(CandidateReadSerializer(rows).data),
+            ),
+            'query + serialize': (
+                lambda: renderer.render(CandidateSerializer(queryset.all(), many=True).data),
+                lambda: renderer.render(CandidateReadSerializer(CandidateReadSerializer.prepare(queryset.all())).data),
+            ),
+        }
+
+        for case, (model_serializer, fast_serializer) in cases.items():
+            if model_serializer() != fast_serializer():
+                raise CommandError('The serializers rendered different JSON.')
+
+            timings = []
+            for render in (model_serializer, fast_serializer):
+                started_at = time.perf_counter()
+                for _ in range(iterations):
+                    render()
+                timings.append((time.perf_counter() - started_at) / iterations * 1000)
+
+            self.stdout.write(
+                f'{case}: CandidateSerializer {timings[0]:.3f} ms, CandidateReadSerializer {timings[1]:.3f} ms '
+                f'per {page_size}-row page ({timings[0] / timings[1]:.1f}x faster)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Rendered JSON is byte-identical.'))
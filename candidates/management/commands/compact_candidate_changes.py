@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from candidates.models import CandidateChange
+
+
+class Command(BaseCommand):
+    help = 'Compact the candidate change outbox and drop expired deletion entries'
+
+    def add_arguments(self, parser):
+        changes_settings = settings.CANDIDATE_CHANGES
+        parser.add_argument(
+            '--compact-after-hours', type=float, default=changes_settings['COMPACT_AFTER_HOURS'],
+            help='Age after which changes superseded by a later change of the same candidate are dropped.',
+        )
+        parser.add_argument(
+            '--retention-days', type=float, default=changes_settings['RETENTION_DAYS'],
+            help='Age after which deletion entries are dropped; consumers lagging further behind must resync.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=changes_settings['BATCH_SIZE'], help='Entries examined per DELETE.',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        # Step 1: Drop the changes superseded by a later change of the same candidate.
+        # Consumers still converge on every candidate's latest state, and a new
+        # consumer can bootstrap from `since=0` instead of scanning the candidates.
+        later_change = CandidateChange.objects.filter(candidate_id=OuterRef('candidate_id'), sequence__gt=OuterRef('sequence'))
+        superseded = CandidateChange.objects.filter(
+            Exists(later_change), created_at__lt=now - timedelta(hours=options['compact_after_hours'])
+        )
+        compacted = self.delete_in_batches(superseded, batch_size)
+        self.stdout.write(self.style.SUCCESS(f'{compacted} superseded changes compacted.'))
+
+        # Step 2: Drop the deletion entries past retention. Candidate ids are never
+        # reused, so nothing follows them.
+        expired = CandidateChange.objects.filter(
+            operation=CandidateChange.DELETE, created_at__lt=now - timedelta(days=options['retention_days'])
+        )
+        purged = self.delete_in_batches(expired, batch_size)
+        self.stdout.write(self.style.SUCCESS(f'{purged} expired deletion entries purged.'))
+
+    def delete_in_batches(self, queryset, batch_size):
+        """
+        Deletes the entries of `queryset` batch_size sequences at a time, walking
+        the primary key so writers are only blocked for one short transaction at a time.
+        """
+        deleted = 0
+        last_sequence = 0
+        while True:
+            batch = list(
+                queryset.filter(sequence__gt=last_sequence).order_by('sequence').values_list('sequence', flat=True)[:batch_size]
+            )
+            if not batch:
+                return deleted
+            with transaction.atomic():
+                deleted += CandidateChange.objects.filter(sequence__in=batch).delete()[0]
+            last_sequence = batch[-1]
@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from candidates.models import Candidate
+from candidates.cache import bump_candidates_version
+from candidates.search import sync_search_indexes
+from candidates.serializers import CandidateBulkCreateSerializer
+from candidates.utils import analyze_table
+
+
+def read_records(path, file_format):
+    """
+    Lazily yields raw records from an NDJSON or CSV file, one at a time.
+    Unparseable NDJSON lines are yielded as their error message.
+    """
+    with open(path, newline='', encoding='utf-8') as handle:
+        if file_format == 'csv':
+            yield from csv.DictReader(handle)
+            return
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield f'Invalid JSON: {exc}'
+
+
+def validate_batch(offset, records):
+    """
+    Validates a batch of raw records without touching the database; runs in worker processes.
+    Returns the batch offset, the valid rows and (record offset, errors) pairs.
+    """
+    valid, rejected = [], []
+    for index, record in enumerate(records, start=offset):
+        if not isinstance(record, dict):
+            rejected.append((index, {'non_field_errors': [str(record)]}))
+            continue
+        serializer = CandidateBulkCreateSerializer(data=record)
+        if serializer.is_valid():
+            valid.append(dict(serializer.validated_data))
+        else:
+            rejected.append((index, serializer.errors))
+    return offset, valid, rejected
+
+
+class Command(BaseCommand):
+    help = 'Stream candidates from an NDJSON or CSV file into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON or CSV file to import.')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help='File format. Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Records validated and inserted per batch.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Validation processes; 1 validates inline.')
+        parser.add_argument('--checkpoint', help='File recording the offset of the last committed record.')
+        parser.add_argument('--resume', action='store_true', help='Skip the records already committed per --checkpoint.')
+        parser.add_argument('--error-log', help='NDJSON file receiving the offset and errors of rejected records.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+        file_format = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'ndjson')
+        batch_size = options['batch_size']
+        workers = max(1, options['workers'] or 1)
+        checkpoint = Path(options['checkpoint']) if options['checkpoint'] else None
+
+        start = 0
+        if options['resume']:
+            if checkpoint is None:
+                raise CommandError('--resume requires --checkpoint.')
+            if checkpoint.exists():
+                start = int(checkpoint.read_text().strip() or 0)
+
+        self.stdout.write(self.style.WARNING(f'Loading candidates from {path} ({file_format}), starting at record {start}...'))
+
+        self.inserted = self.duplicates = self.rejected = 0
+        self.started_at = time.monotonic()
+        self.error_log = open(options['error_log'], 'a', encoding='utf-8') if options['error_log'] else None
+
+        records = islice(read_records(path, file_format), start, None)
+        batches = self.batches(records, start, batch_size)
+        try:
+            if workers == 1:
+                for offset, batch in batches:
+                    self.write_batch(*validate_batch(offset, batch), len(batch), checkpoint)
+            else:
+                self.load_in_parallel(batches, workers, checkpoint)
+        finally:
+            if self.error_log:
+                self.error_log.close()
+        # Fresh statistics for the query planner and the admin's estimated counts.
+        analyze_table(Candidate)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Completed: {self.inserted} inserted, {self.duplicates} duplicate emails skipped, '
+            f'{self.rejected} invalid records rejected.'
+        ))
+
+    def batches(self, records, start, batch_size):
+        offset = start
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            yield offset, batch
+            offset += len(batch)
+
+    def load_in_parallel(self, batches, workers, checkpoint):
+        """
+        Validates batches in a process pool while keeping at most two batches per
+        worker in flight, and writes their results in input order.
+        """
+        in_flight = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            for offset, batch in batches:
+                in_flight.append((executor.submit(validate_batch, offset, batch), len(batch)))
+                if len(in_flight) >= workers * 2:
+                    future, size = in_flight.popleft()
+                    self.write_batch(*future.result(), size, checkpoint)
+            while in_flight:
+                future, size = in_flight.popleft()
+                self.write_batch(*future.result(), size, checkpoint)
+
+    def write_batch(self, offset, valid, rejected, size, checkpoint):
+        """
+        Skips emails already stored or repeated in the batch, inserts the rest and
+        records the checkpoint once the batch is committed.
+        """
+        existing = set(
+            Candidate.objects.filter(email__in=[row['email'] for row in valid]).values_list('email', flat=True)
+        )
+        candidates = []
+        for row in valid:
+            if row['email'] in existing:
+                self.duplicates += 1
+                continue
+            existing.add(row['email'])
+            candidates.append(Candidate(**row))
+
+        with transaction.atomic():
+            sync_search_indexes(Candidate.objects.bulk_create(candidates))
+            bump_candidates_version()
+
+        self.inserted += len(candidates)
+        self.rejected += len(rejected)
+        if self.error_log:
+            for index, errors in rejected:
+                self.error_log.write(json.dumps({'record': index, 'errors': errors}) + '\n')
+        if checkpoint is not None:
+            # Replace atomically so an interrupted run never leaves a truncated checkpoint.
+            pending = checkpoint.with_name(checkpoint.name + '.tmp')
+            pending.write_text(str(offset + size))
+            os.replace(pending, checkpoint)
+
+        elapsed = time.monotonic() - self.started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'{offset + size} records read, {self.inserted} inserted '
+            f'({self.inserted / elapsed if elapsed else 0:.0f} candidates/s)...'
+        ))
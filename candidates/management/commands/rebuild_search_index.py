@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from candidates.search import rebuild_search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the candidate name token search index and fuzzy-search vocabulary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Candidates indexed per batch.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Clearing the name token index...'))
+        indexed = rebuild_search_indexes(
+            options['batch_size'],
+            progress=lambda indexed: self.stdout.write(self.style.SUCCESS(f'{indexed} candidates indexed...')),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Completed indexing {indexed} candidates!'))
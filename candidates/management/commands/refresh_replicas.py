@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the local replica stand-ins'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Only SQLite replica stand-ins can be refreshed; real replicas use replication.')
+        replicas = settings.DATABASE_ROUTING.get('REPLICAS', [])
+        if not replicas:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS.')
+
+        # Step 1: Make sure the primary connection is open
+        connection.ensure_connection()
+
+        # Step 2: Copy it page by page through SQLite's online backup API,
+        # which is consistent even while the primary is being written to
+        for alias in replicas:
+            name = settings.DATABASES[alias]['NAME']
+            replica = sqlite3.connect(name)
+            try:
+                connection.connection.backup(replica)
+            finally:
+                replica.close()
+            self.stdout.write(self.style.SUCCESS(f'{alias} ({name}) refreshed from the primary.'))
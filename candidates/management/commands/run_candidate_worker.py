@@ -0,0 +1,104 @@
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from candidates.jobs import claim_job, new_worker_name, requeue_stale_jobs, run_job
+from candidates.models import CandidateJob
+
+
+class Command(BaseCommand):
+    help = 'Run queued candidate jobs (imports, exports, reindexing, bulk deletes) in a thread pool'
+
+    def add_arguments(self, parser):
+        job_settings = settings.CANDIDATE_JOBS
+        parser.add_argument('--concurrency', type=int, default=job_settings['CONCURRENCY'], help='Jobs run at once.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=job_settings['POLL_INTERVAL'], help='Seconds between queue polls.',
+        )
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is running or due.')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker = new_worker_name()
+        self.stopping = threading.Event()
+        previous_handlers = self.install_signal_handlers()
+        self.stdout.write(self.style.WARNING(f'Worker {worker} running up to {concurrency} jobs at once...'))
+
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='candidate-job') as executor:
+                while True:
+                    # Step 1: Report the jobs that finished
+                    for future in [future for future in running if future.done()]:
+                        self.report(future.result())
+                        del running[future]
+                    if self.stopping.is_set() and not running:
+                        break
+
+                    # Step 2: Keep this worker's jobs alive and recover those of lost workers
+                    close_old_connections()
+                    CandidateJob.objects.filter(status=CandidateJob.RUNNING, worker=worker).update(
+                        heartbeat_at=timezone.now()
+                    )
+                    recovered = requeue_stale_jobs()
+                    if recovered:
+                        self.stdout.write(self.style.WARNING(f'{recovered} jobs of lost workers recovered.'))
+
+                    # Step 3: Claim due jobs while threads are free
+                    while not self.stopping.is_set() and len(running) < concurrency:
+                        job = claim_job(worker)
+                        if job is None:
+                            break
+                        self.stdout.write(f'Started {job} (attempt {job.attempts}).')
+                        running[executor.submit(self.run, job, worker)] = job
+                    if options['burst'] and not running:
+                        break
+
+                    # Step 4: Wait for a job to finish or the next poll
+                    if running:
+                        wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    else:
+                        self.stopping.wait(options['poll_interval'])
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker} stopped.'))
+
+    def run(self, job, worker):
+        try:
+            return run_job(job, worker)
+        finally:
+            # Every pool thread opened its own connection.
+            connection.close()
+
+    def report(self, job):
+        style = self.style.SUCCESS if job.status == CandidateJob.SUCCEEDED else self.style.WARNING
+        detail = job.error if job.status in (CandidateJob.FAILED, CandidateJob.QUEUED) else job.result
+        self.stdout.write(style(f'{job} after attempt {job.attempts}: {job.progress}/{job.total or "?"} done, {detail or "-"}.'))
+
+    def install_signal_handlers(self):
+        """
+        Stops claiming jobs on SIGINT/SIGTERM and exits once the running ones
+        finished. A second signal exits at once; the interrupted jobs are
+        requeued by another worker once HEARTBEAT_TIMEOUT passed.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+
+        def stop(signum, frame):
+            if self.stopping.is_set():
+                # Pool threads cannot be interrupted, and an orderly exit would wait for them.
+                os._exit(128 + signum)
+            self.stdout.write(self.style.WARNING('Stopping once the running jobs finished...'))
+            self.stopping.set()
+
+        previous_handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+        for signum in previous_handlers:
+            signal.signal(signum, stop)
+        return previous_handlers
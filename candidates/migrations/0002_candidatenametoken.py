@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from candidates.search import name_index_keys
+
+
+def build_name_token_index(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CandidateNameToken = apps.get_model('candidates', 'CandidateNameToken')
+
+    tokens = []
+    for candidate_id, name in Candidate.objects.values_list('id', 'name').iterator(chunk_size=2000):
+        tokens.extend(CandidateNameToken(key=key, candidate_id=candidate_id) for key in name_index_keys(name))
+        if len(tokens) >= 10000:
+            CandidateNameToken.objects.bulk_create(tokens)
+            tokens = []
+    CandidateNameToken.objects.bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateNameToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_tokens', to='candidates.candidate')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key', 'candidate'), name='unique_candidate_name_token')],
+            },
+        ),
+        migrations.RunPython(build_name_token_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from candidates.search import install_fulltext_index, uninstall_fulltext_index
+
+
+def install(apps, schema_editor):
+    install_fulltext_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_fulltext_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0002_candidatenametoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:37
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0003_candidate_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='candidate_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['gender', 'age'], name='candidate_gender_age_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['name', 'id'], include=('age', 'gender', 'email', 'phone_number'), name='candidate_name_covering_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:41
+
+from django.db import migrations, models
+
+from candidates.search import tokenize, trigrams
+
+
+def build_name_vocabulary(apps, schema_editor):
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CandidateNameTrigram = apps.get_model('candidates', 'CandidateNameTrigram')
+
+    tokens = set()
+    for name in Candidate.objects.values_list('name', flat=True).iterator(chunk_size=2000):
+        tokens.update(tokenize(name))
+    CandidateNameTrigram.objects.bulk_create(
+        (CandidateNameTrigram(trigram=trigram, token=token) for token in tokens for trigram in trigrams(token)),
+        batch_size=10000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0004_candidate_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateNameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('token', models.CharField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token'], name='candidate_trigram_token_idx')],
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'token'), name='unique_candidate_name_trigram')],
+            },
+        ),
+        migrations.RunPython(build_name_vocabulary, migrations.RunPython.noop),
+    ]
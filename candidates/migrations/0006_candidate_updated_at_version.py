@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+from candidates.search import install_fulltext_index
+
+
+def reinstall_fulltext_index(apps, schema_editor):
+    # Adding a column rebuilds the candidate table on SQLite, which drops the FTS5 sync triggers.
+    install_fulltext_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0005_candidatenametrigram'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the columns are removed again.
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fulltext_index),
+        migrations.AddField(
+            model_name='candidate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(reinstall_fulltext_index, migrations.RunPython.noop),
+    ]
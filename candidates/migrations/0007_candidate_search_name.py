@@ -0,0 +1,84 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:56
+
+from django.db import migrations, models
+
+from candidates.search import install_fulltext_index, name_index_keys, trigrams
+from candidates.text import search_fields, tokenize
+
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def reinstall_fulltext_index(apps, schema_editor):
+    # Adding a column rebuilds the candidate table on SQLite, which drops the FTS5 sync triggers.
+    install_fulltext_index(schema_editor)
+
+
+def backfill_search_fields(apps, schema_editor):
+    """
+    Fills the search columns BACKFILL_BATCH_SIZE candidates at a time, walking
+    the primary key so no batch rescans earlier rows. Tokens now lose their
+    accents, so accented names are also re-added to the fuzzy-search vocabulary
+    and, when it is in use, the name token index.
+    """
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CandidateNameToken = apps.get_model('candidates', 'CandidateNameToken')
+    CandidateNameTrigram = apps.get_model('candidates', 'CandidateNameTrigram')
+    token_index_in_use = CandidateNameToken.objects.exists()
+
+    last_id = 0
+    while True:
+        batch = list(Candidate.objects.filter(id__gt=last_id).order_by('id').only('id', 'name')[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            return
+        for candidate in batch:
+            fields = search_fields(candidate.name)
+            for field, value in fields.items():
+                setattr(candidate, field, value)
+        # The columns search_fields() fills today: search_name is dropped again by 0011.
+        Candidate.objects.bulk_update(batch, list(fields))
+        last_id = batch[-1].id
+
+        accented = [candidate for candidate in batch if not candidate.name.isascii()]
+        if not accented:
+            continue
+        tokens = {token for candidate in accented for token in tokenize(candidate.name)}
+        CandidateNameTrigram.objects.bulk_create(
+            [CandidateNameTrigram(trigram=trigram, token=token) for token in tokens for trigram in trigrams(token)],
+            ignore_conflicts=True,
+        )
+        if token_index_in_use:
+            CandidateNameToken.objects.filter(candidate_id__in=[candidate.id for candidate in accented]).delete()
+            CandidateNameToken.objects.bulk_create(
+                CandidateNameToken(key=key, candidate_id=candidate.id)
+                for candidate in accented
+                for key in name_index_keys(candidate.name)
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0006_candidate_updated_at_version'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the columns are removed again.
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fulltext_index),
+        migrations.AddField(
+            model_name='candidate',
+            name='search_name',
+            field=models.CharField(default='', editable=False, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='search_tokens',
+            field=models.CharField(default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(reinstall_fulltext_index, migrations.RunPython.noop),
+        migrations.RunPython(backfill_search_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['search_name'], name='candidate_search_name_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+BACKFILL_BATCH_SIZE = 2000
+# CHANGE_FIELDS as of this migration.
+SNAPSHOT_FIELDS = ('id', 'name', 'age', 'gender', 'email', 'phone_number', 'version')
+
+
+def record_existing_candidates(apps, schema_editor):
+    """
+    Records a 'create' change for every existing candidate, so a consumer reading
+    the feed from `since=0` sees the whole table. Walks the primary key
+    BACKFILL_BATCH_SIZE candidates at a time.
+    """
+    Candidate = apps.get_model('candidates', 'Candidate')
+    CandidateChange = apps.get_model('candidates', 'CandidateChange')
+
+    last_id = 0
+    while True:
+        batch = list(Candidate.objects.filter(id__gt=last_id).order_by('id').values(*SNAPSHOT_FIELDS)[:BACKFILL_BATCH_SIZE])
+        if not batch:
+            return
+        CandidateChange.objects.bulk_create(
+            CandidateChange(candidate_id=snapshot['id'], operation='create', data=snapshot) for snapshot in batch
+        )
+        last_id = batch[-1]['id']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0007_candidate_search_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateChange',
+            fields=[
+                ('sequence', models.BigAutoField(primary_key=True, serialize=False)),
+                ('candidate_id', models.BigIntegerField()),
+                ('operation', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('data', models.JSONField(null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['candidate_id', 'sequence'], name='candidate_change_candidate_idx'), models.Index(fields=['created_at'], name='candidate_change_created_idx')],
+            },
+        ),
+        migrations.RunPython(record_existing_candidates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0009_candidatejob'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candidate',
+            name='candidate_search_name_idx',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:45
+
+from django.db import migrations
+
+from candidates.search import install_fulltext_index
+
+
+def reinstall_fulltext_index(apps, schema_editor):
+    # Removing a column may rebuild the candidate table on SQLite, which drops the FTS5 sync triggers.
+    install_fulltext_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0010_remove_candidate_search_name_idx'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after the column is added again.
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fulltext_index),
+        migrations.RemoveField(
+            model_name='candidate',
+            name='search_name',
+        ),
+        migrations.RunPython(reinstall_fulltext_index, migrations.RunPython.noop),
+    ]
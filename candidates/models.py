@@ -1,4 +1,72 @@
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .text import search_fields
+
+
+SEARCH_FIELDS = ('search_tokens',)
+# Candidate fields copied into the change outbox.
+CHANGE_FIELDS = ('id', 'name', 'age', 'gender', 'email', 'phone_number', 'version')
+# Advisory lock key of the outbox writers on PostgreSQL.
+OUTBOX_LOCK_ID = 0x63616e64
+
+
+class CandidateQuerySet(models.QuerySet):
+    """
+    Keeps the precomputed search columns in sync, and records the changes in the
+    outbox within the same transaction, on the bulk write paths, which bypass
+    `Candidate.save()` and `delete()`.
+    """
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for candidate in objs:
+            candidate.refresh_search_fields()
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            # Rows skipped with ignore_conflicts get no primary key and are not recorded.
+            CandidateChange.record(
+                CandidateChange.CREATE, [candidate.change_snapshot() for candidate in created if candidate.pk], self.db
+            )
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if 'name' in fields:
+            for candidate in objs:
+                candidate.refresh_search_fields()
+            fields = [*fields, *SEARCH_FIELDS]
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            updated = super().bulk_update(objs, fields, *args, **kwargs)
+            CandidateChange.record_current(CandidateChange.UPDATE, [candidate.pk for candidate in objs], self.db)
+        return updated
+
+    def update(self, **kwargs):
+        if isinstance(kwargs.get('name'), str):
+            kwargs.update(search_fields(kwargs['name']))
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            # Collected first: the update may change which candidates the filter matches.
+            ids = list(self.values_list('pk', flat=True))
+            updated = super().update(**kwargs)
+            CandidateChange.record_current(CandidateChange.UPDATE, ids, self.db)
+        return updated
+
+    def delete(self):
+        # cache imports search, which imports this module.
+        from .cache import bump_candidates_version
+
+        self._for_write = True
+        with transaction.atomic(using=self.db, savepoint=False):
+            ids = list(self.values_list('pk', flat=True))
+            deleted = super().delete()
+            CandidateChange.record(CandidateChange.DELETE, [{'id': pk} for pk in ids], self.db)
+            # Once per statement; the post_delete receivers skip queryset deletions.
+            bump_candidates_version()
+        return deleted
 
 
 class Candidate(models.Model):
@@ -13,7 +81,250 @@ class Candidate(models.Model):
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=15)
+    # Bumped on every write; together they make up the conditional request validators.
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)
+    # Derived from `name` on every write (see candidates.text.search_fields), so that
+    # searches compare precomputed, casefolded and accent-stripped tokens.
+    search_tokens = models.CharField(max_length=512, default='', editable=False)
+
+    objects = CandidateQuerySet.as_manager()
     
+    class Meta:
+        indexes = [
+            # Case-insensitive name ordering and Lower(name) comparisons.
+            models.Index(Lower('name'), name='candidate_name_lower_idx'),
+            # gender / age_min / age_max filters and the admin list filters.
+            models.Index(fields=['gender', 'age'], name='candidate_gender_age_idx'),
+            # Name-ordered listings (admin changelist); covering on PostgreSQL.
+            models.Index(
+                fields=['name', 'id'],
+                include=['age', 'gender', 'email', 'phone_number'],
+                name='candidate_name_covering_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        """
+        Bumps the row version of existing candidates and refreshes the search
+        columns. The detail API saves under a row lock, so concurrent writers
+        never produce the same version.
+        """
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            update_fields = kwargs['update_fields'] = {*update_fields, *SEARCH_FIELDS}
+        if not self._state.adding:
+            self.version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version', 'updated_at'}
+        # The post_save receivers write the outbox entry in the same transaction.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+    def refresh_search_fields(self):
+        for field, value in search_fields(self.name).items():
+            setattr(self, field, value)
+
+    def change_snapshot(self):
+        """
+        The candidate's fields as recorded in the change outbox.
+        """
+        return {field: getattr(self, field) for field in CHANGE_FIELDS}
+
+    @property
+    def etag(self):
+        """
+        Strong entity tag of the candidate's representation.
+        """
+        return f'"{self.pk}-{self.version}"'
+
+
+class CandidateNameToken(models.Model):
+    """
+    Inverted index entry mapping a normalized name token (or one of its prefixes)
+    to the candidate whose name contains it.
+    """
+    key = models.CharField(max_length=255)
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='name_tokens')
+
+    class Meta:
+        constraints = [
+            # Leading `key` column doubles as the posting-list lookup index.
+            models.UniqueConstraint(fields=['key', 'candidate'], name='unique_candidate_name_token'),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class CandidateNameTrigram(models.Model):
+    """
+    Trigram of a distinct name token. The index covers the vocabulary of name
+    tokens rather than every candidate, so it stays small; fuzzy search uses it
+    to find the known tokens close to a misspelled query term.
+    """
+    trigram = models.CharField(max_length=3)
+    token = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            # Leading `trigram` column doubles as the posting-list lookup index.
+            models.UniqueConstraint(fields=['trigram', 'token'], name='unique_candidate_name_trigram'),
+        ]
+        indexes = [
+            # Checks which tokens of newly written names are already known.
+            models.Index(fields=['token'], name='candidate_trigram_token_idx'),
+        ]
+
+    def __str__(self):
+        return self.trigram
+
+
+class CandidateChange(models.Model):
+    """
+    Transactional outbox entry: one create, update or delete of a candidate,
+    written in the transaction of the change itself. `sequence` increases
+    with every entry (AUTOINCREMENT on SQLite, a sequence on PostgreSQL), so
+    consumers sync incrementally by reading the entries after the last
+    sequence they processed (`GET /api/candidates/changes/?since=`).
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    OPERATION_CHOICES = [
+        (CREATE, 'Create'),
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+    ]
+
+    sequence = models.BigAutoField(primary_key=True)
+    # Not a foreign key: entries outlive the candidates they describe.
+    candidate_id = models.BigIntegerField()
+    operation = models.CharField(max_length=6, choices=OPERATION_CHOICES)
+    # The candidate's CHANGE_FIELDS after the change; null for deletions.
+    data = models.JSONField(null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Finds the later changes of a candidate (compaction).
+            models.Index(fields=['candidate_id', 'sequence'], name='candidate_change_candidate_idx'),
+            # Finds the changes past compaction or retention age.
+            models.Index(fields=['created_at'], name='candidate_change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.sequence} {self.operation} {self.candidate_id}'
+
+    @classmethod
+    def record(cls, operation, snapshots, using):
+        """
+        Appends one entry per snapshot (a dict holding at least the candidate 'id').
+        """
+        changes = [
+            cls(candidate_id=snapshot['id'], operation=operation, data=None if operation == cls.DELETE else snapshot)
+            for snapshot in snapshots
+        ]
+        if not changes:
+            return
+        cls.lock(using)
+        cls.objects.using(using).bulk_create(changes, batch_size=settings.CANDIDATE_CHANGES['BATCH_SIZE'])
+
+    @classmethod
+    def lock(cls, using):
+        """
+        On PostgreSQL, serializes outbox writers until commit, so sequences commit
+        in order and a consumer never skips an entry committed after a higher sequence.
+        Writers appending entries without `record` must call it first.
+        """
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [OUTBOX_LOCK_ID])
+
+    @classmethod
+    def record_current(cls, operation, ids, using):
+        """
+        Appends one entry per candidate of `ids`, with its fields as currently stored.
+        """
+        batch_size = settings.CANDIDATE_CHANGES['BATCH_SIZE']
+        for start in range(0, len(ids), batch_size):
+            rows = Candidate._base_manager.using(using).filter(pk__in=ids[start:start + batch_size]).order_by('pk')
+            cls.record(operation, rows.values(*CHANGE_FIELDS), using)
+
+
+class CandidateJob(models.Model):
+    """
+    Background job on the candidates (import, export, reindex, bulk delete),
+    queued by the jobs API and run by `run_candidate_worker`.
+    """
+    IMPORT = 'import'
+    EXPORT = 'export'
+    REINDEX = 'reindex'
+    BULK_DELETE = 'bulk_delete'
+    KIND_CHOICES = [
+        (IMPORT, 'Import'),
+        (EXPORT, 'Export'),
+        (REINDEX, 'Reindex'),
+        (BULK_DELETE, 'Bulk delete'),
+    ]
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+        (CANCELLED, 'Cancelled'),
+    ]
+    FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    # Units of work done (rows, records, candidates) and in total, when known.
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # Queued jobs run from this time on; retries are pushed back.
+    run_after = models.DateTimeField(default=timezone.now)
+    cancel_requested = models.BooleanField(default=False)
+    # Worker running the job, and its last sign of life (see HEARTBEAT_TIMEOUT).
+    worker = models.CharField(max_length=255, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Next due queued job, and running jobs per kind (claiming).
+            models.Index(fields=['status', 'run_after'], name='candidate_job_queue_idx'),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f'{self.kind} #{self.pk} ({self.status})'
+
+    def cancel(self):
+        """
+        Cancels the job if it is queued, or asks its worker to stop it at its next
+        progress report if it is running. Returns False if it already finished.
+        """
+        jobs = CandidateJob.objects.filter(pk=self.pk)
+        cancelled = (
+            jobs.filter(status=self.QUEUED).update(status=self.CANCELLED, cancel_requested=True, finished_at=timezone.now())
+            or jobs.filter(status=self.RUNNING).update(cancel_requested=True)
+        )
+        self.refresh_from_db()
+        return bool(cancelled)
@@ -1,7 +1,317 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import reduce
+from operator import or_
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator as DjangoPaginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.fields import BooleanField
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CandidatePagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 100
\ No newline at end of file
+    max_page_size = 100
+
+
+class SingleQueryPage(Page):
+    """
+    Page that knows whether a next page exists without counting the result set.
+    """
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class SingleQueryPaginator(DjangoPaginator):
+    """
+    Paginator that loads a page with one query by fetching a single row past it.
+    `count` still runs a COUNT(*) when read, except once the last page has been
+    loaded, where the total is known for free.
+    """
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        return self.build_page(number, list(self.page_rows(number)))
+
+    async def apage(self, number):
+        """
+        Async `page()`, fetching the rows through the async ORM.
+        """
+        number = self.validate_number(number)
+        return self.build_page(number, [row async for row in self.page_rows(number).aiterator()])
+
+    def page_rows(self, number):
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom:bottom + self.per_page + 1]
+
+    def build_page(self, number, rows):
+        bottom = (number - 1) * self.per_page
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        if not has_next:
+            # Prime the cached `count` property so it is never queried.
+            self.__dict__['count'] = bottom + len(rows)
+        self.__dict__['num_pages'] = number + 1 if has_next else number
+        return SingleQueryPage(rows, number, self, has_next)
+
+
+class CandidateSearchPagination(CandidatePagination):
+    """
+    Search pagination that costs one query per page. The total `count` is only
+    computed when `count=true` is requested (or is known from reaching the last
+    page), and is `null` otherwise.
+    """
+    django_paginator_class = SingleQueryPaginator
+    count_query_param = 'count'
+    # Resolving 'last' would require a count.
+    last_page_strings = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.include_count = request.query_params.get(self.count_query_param) in BooleanField.TRUE_VALUES
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async `paginate_queryset()`. When `count=true`, the COUNT(*) runs after
+        the page fetch, unless reaching the last page made the total known. The
+        async ORM runs a request's queries one at a time on one thread and
+        connection, so they cannot overlap.
+        """
+        self.request = request
+        self.include_count = request.query_params.get(self.count_query_param) in BooleanField.TRUE_VALUES
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = await paginator.apage(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        if self.include_count and 'count' not in paginator.__dict__:
+            paginator.__dict__['count'] = await queryset.acount()
+        return list(self.page)
+
+    def get_page_state(self):
+        """
+        Returns what is needed to rebuild this page's response without querying.
+        """
+        paginator = self.page.paginator
+        return {
+            'number': self.page.number,
+            'per_page': paginator.per_page,
+            'has_next': self.page.has_next(),
+            # Counted now if requested, so a cache hit never has to count.
+            'count': paginator.count if self.include_count else paginator.__dict__.get('count'),
+        }
+
+    def restore_page_state(self, request, state):
+        """
+        Restores a page from `get_page_state()`; links are rebuilt for `request`.
+        """
+        self.request = request
+        self.include_count = request.query_params.get(self.count_query_param) in BooleanField.TRUE_VALUES
+        paginator = self.django_paginator_class([], state['per_page'])
+        if state['count'] is not None:
+            paginator.__dict__['count'] = state['count']
+        self.page = SingleQueryPage([], state['number'], paginator, state['has_next'])
+
+    def get_paginated_response(self, data, headers=None):
+        return Response(self.get_paginated_data(data), headers=headers)
+
+    def get_paginated_data(self, data):
+        paginator = self.page.paginator
+        count_known = 'count' in paginator.__dict__
+        return {
+            'count': paginator.count if self.include_count or count_known else None,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['nullable'] = True
+        return response_schema
+
+
+class CandidateKeysetPagination(BasePagination):
+    """
+    Forward-only keyset (cursor) pagination over a unique ordering. The cursor
+    holds the ordering values of the last row served, and the next page is
+    fetched with a `WHERE (ordering) > (cursor)` filter, so every page costs
+    the same no matter how deep it is.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    # Must end with a unique field so that positions are unambiguous.
+    ordering = ('id',)
+    # JSON types a cursor may hold for each ordering field; include type(None) only for nullable fields.
+    position_types = {'id': (int,)}
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        return self.build_page(list(self.page_rows(queryset, request, page_size)), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async `paginate_queryset()`, fetching the rows through the async ORM.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        rows = [row async for row in self.page_rows(queryset, request, page_size).aiterator()]
+        return self.build_page(rows, page_size)
+
+    def page_rows(self, queryset, request, page_size):
+        """
+        Returns the queryset of the rows after the cursor position, plus one to detect a next page.
+        """
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        return queryset[:page_size + 1]
+
+    def build_page(self, rows, page_size):
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_page_state(self):
+        """
+        Returns what is needed to rebuild this page's response without querying.
+        """
+        return {'has_next': self.has_next, 'next_position': self.next_position}
+
+    def restore_page_state(self, request, state):
+        """
+        Restores a page from `get_page_state()`; links are rebuilt for `request`.
+        """
+        self.request = request
+        self.has_next = state['has_next']
+        self.next_position = state['next_position']
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_position(self, row):
+        """
+        Returns the ordering values of a row, read from a model instance or a `.values()` dict.
+        """
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[field] for field in fields]
+        return [getattr(row, field) for field in fields]
+
+    def get_position_filter(self, position):
+        """
+        Builds the filter selecting rows strictly after `position` in `self.ordering`.
+        """
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            ties = {prev.lstrip('-'): value for prev, value in zip(self.ordering[:index], position)}
+            conditions.append(Q(**ties, **{f'{name}__{lookup}': position[index]}))
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering) or not self.is_valid_position(position):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def is_valid_position(self, position):
+        """
+        Checks every cursor value against the type of its ordering field, so a
+        tampered cursor never reaches the database.
+        """
+        for field, value in zip(self.ordering, position):
+            # bool is an int subclass, but never a valid position.
+            if isinstance(value, bool) or not isinstance(value, self.position_types[field.lstrip('-')]):
+                return False
+            if isinstance(value, float) and not math.isfinite(value):
+                return False
+            # Larger integers cannot be bound as query parameters by every driver.
+            if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+                return False
+        return True
+
+    def encode_cursor(self, position):
+        return urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data, headers=None):
+        return Response(self.get_paginated_data(data), headers=headers)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': 'http://api.example.org/accounts/?{cursor_query_param}=WzQyXQ=='.format(
+                        cursor_query_param=self.cursor_query_param)
+                },
+                'results': schema,
+            },
+        }
+
+
+class CandidateSearchKeysetPagination(CandidateKeysetPagination):
+    """
+    Keyset pagination for ranked search results.
+    """
+    max_page_size = 100
+    ordering = ('-relevancy', 'id')
+    # Scores are integers or floats depending on the search backend.
+    position_types = {'relevancy': (int, float), 'id': (int,)}
@@ -0,0 +1,562 @@
+import operator
+from contextlib import contextmanager
+from functools import lru_cache, reduce
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Case, Count, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Length
+
+from .models import Candidate, CandidateNameToken, CandidateNameTrigram
+from .text import tokenize
+
+# Prefixes longer than this are not indexed; the full token always is.
+MAX_PREFIX_LENGTH = 20
+
+# Columns mirrored into the database full-text index, with their PostgreSQL weights.
+FULLTEXT_COLUMNS = {'name': 'A', 'email': 'B', 'phone_number': 'C'}
+
+# Fuzzy matching: terms shorter than this are never corrected, at most this many
+# corrections are kept per term, and only those at least this similar to it.
+FUZZY_MIN_TERM_LENGTH = 3
+FUZZY_MAX_VARIANTS = 3
+FUZZY_MIN_SIMILARITY = 0.7
+# Known tokens sharing the most trigrams with a term that are scored by edit distance.
+FUZZY_CANDIDATE_LIMIT = 200
+
+CANDIDATE_TABLE = Candidate._meta.db_table
+SQLITE_FTS_TABLE = f'{CANDIDATE_TABLE}_fts'
+
+
+def query_terms(query):
+    """
+    Returns the distinct normalized search terms of a query, in order.
+    """
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def name_index_keys(name):
+    """
+    Returns every key under which a name is indexed: each token and its prefixes.
+    """
+    keys = set()
+    for token in tokenize(name):
+        keys.add(token)
+        keys.update(token[:length] for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1))
+    return keys
+
+
+def index_candidates(candidates, batch_size=10000):
+    """
+    (Re)builds the name token index entries for the given saved candidates.
+    """
+    candidates = [candidate for candidate in candidates if candidate.pk is not None]
+    if not candidates:
+        return
+
+    with transaction.atomic():
+        CandidateNameToken.objects.filter(candidate_id__in=[c.pk for c in candidates]).delete()
+        tokens = [
+            CandidateNameToken(key=key, candidate_id=candidate.pk)
+            for candidate in candidates
+            for key in name_index_keys(candidate.name)
+        ]
+        CandidateNameToken.objects.bulk_create(tokens, batch_size=batch_size)
+
+
+def sync_search_indexes(candidates):
+    """
+    Indexes candidates written without `post_save` (e.g. by `bulk_create`): adds
+    their name tokens to the fuzzy-search vocabulary and, when the token backend
+    is active, to the token index. The full-text backends index through the database.
+    """
+    index_name_vocabulary(candidate.name for candidate in candidates)
+    if get_search_backend().uses_token_index:
+        index_candidates(candidates)
+
+
+def rebuild_search_indexes(batch_size=2000, progress=None):
+    """
+    Rebuilds the name token index and the fuzzy-search vocabulary from scratch,
+    `batch_size` candidates at a time, calling `progress(indexed)` after every batch.
+    Returns the number of candidates indexed.
+    """
+    CandidateNameToken.objects.all().delete()
+    CandidateNameTrigram.objects.all().delete()
+
+    indexed = 0
+    batch = []
+    for candidate in Candidate.objects.only('id', 'name').iterator(chunk_size=batch_size):
+        batch.append(candidate)
+        if len(batch) == batch_size:
+            indexed += index_batch(batch)
+            if progress is not None:
+                progress(indexed)
+            batch = []
+
+    if batch:
+        indexed += index_batch(batch)
+        if progress is not None:
+            progress(indexed)
+    return indexed
+
+
+def index_batch(candidates):
+    index_candidates(candidates)
+    index_name_vocabulary(candidate.name for candidate in candidates)
+    return len(candidates)
+
+
+def trigrams(token):
+    """
+    Returns the trigrams of a token, padded like pg_trgm so that leading
+    characters weigh more than the rest.
+    """
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def index_name_vocabulary(names, batch_size=500):
+    """
+    Adds the tokens of the given names that are not yet known to the fuzzy-search
+    trigram vocabulary. Tokens are never removed on delete or rename; stale ones
+    only cost a correction matching nothing, and `rebuild_search_index` drops them.
+    """
+    tokens = sorted({token for name in names for token in tokenize(name)})
+    for start in range(0, len(tokens), batch_size):
+        chunk = tokens[start:start + batch_size]
+        known = set(
+            CandidateNameTrigram.objects.filter(token__in=chunk).values_list('token', flat=True).distinct()
+        )
+        CandidateNameTrigram.objects.bulk_create(
+            [
+                CandidateNameTrigram(trigram=trigram, token=token)
+                for token in chunk if token not in known
+                for trigram in trigrams(token)
+            ],
+            # A concurrent writer may have added the same token meanwhile.
+            ignore_conflicts=True,
+        )
+
+
+def edit_similarity(a, b):
+    """
+    Returns 1 minus the optimal string alignment distance (Levenshtein plus
+    adjacent transpositions) of two tokens, relative to the longer one.
+    """
+    if a == b:
+        return 1.0
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return 1 - current[-1] / max(len(a), len(b))
+
+
+def fuzzy_variants(term):
+    """
+    Returns up to FUZZY_MAX_VARIANTS known name tokens close to `term`, as
+    (token, similarity) pairs, most similar first. The trigram vocabulary prunes
+    the candidates to the tokens of similar length sharing the most trigrams
+    with the term, so the edit distance is only computed for those.
+    """
+    if len(term) < FUZZY_MIN_TERM_LENGTH:
+        return []
+
+    candidates = (
+        CandidateNameTrigram.objects
+        .alias(token_length=Length('token'))
+        .filter(trigram__in=trigrams(term), token_length__range=(len(term) - 2, len(term) + 2))
+        .values('token')
+        .annotate(shared=Count('trigram'))
+        .order_by('-shared', 'token')
+        .values_list('token', flat=True)[:FUZZY_CANDIDATE_LIMIT]
+    )
+    scored = [
+        (token, similarity)
+        for token in candidates
+        if token != term and (similarity := edit_similarity(term, token)) >= FUZZY_MIN_SIMILARITY
+    ]
+    scored.sort(key=lambda variant: (-variant[1], variant[0]))
+    return scored[:FUZZY_MAX_VARIANTS]
+
+
+def fuzzy_search(query, backend=None):
+    """
+    Matches candidates on the query terms and on their closest known name
+    tokens, so that e.g. 'jonh' also finds John. Relevancy sums, per query term,
+    the similarity of its best variant in the name: the term itself scores 1 as
+    a token prefix, a correction its similarity as a whole token only, so 'jon'
+    does not match Jones. Exact matches thus outrank corrections.
+    """
+    backend = backend or get_search_backend()
+    terms = query_terms(query)
+    if not terms:
+        return Candidate.objects.none()
+
+    tokens, scores = [], []
+    for term in terms:
+        variants = fuzzy_variants(term)
+        tokens.extend([term, *(token for token, _ in variants)])
+        conditions = [
+            Case(When(search_tokens__contains=f' {term}', then=Value(1.0)), default=Value(0.0), output_field=FloatField()),
+            *(
+                Case(When(whole_token_condition(token), then=Value(similarity)), default=Value(0.0), output_field=FloatField())
+                for token, similarity in variants
+            ),
+        ]
+        scores.append(Greatest(*conditions) if len(conditions) > 1 else conditions[0])
+
+    return (
+        # The backend matches every variant as a prefix; candidates matching corrections only that way score 0.
+        backend.match(list(dict.fromkeys(tokens)))
+        .annotate(relevancy=reduce(operator.add, scores))
+        .filter(relevancy__gt=0)
+        .order_by('-relevancy', 'id')
+    )
+
+
+def whole_token_condition(token):
+    """
+    Matches candidates with `token` among their name tokens, within or at the end of `search_tokens`.
+    """
+    return Q(search_tokens__contains=f' {token} ') | Q(search_tokens__endswith=f' {token}')
+
+
+def sqlite_fts5_available():
+    """
+    Reports whether the linked SQLite library was compiled with FTS5.
+    """
+    import sqlite3
+
+    with sqlite3.connect(':memory:') as probe:
+        return ('ENABLE_FTS5',) in probe.execute('PRAGMA compile_options').fetchall()
+
+
+def sqlite_fts_triggers():
+    """
+    Returns the CREATE TRIGGER statements keeping the FTS5 table in sync, by trigger name.
+    """
+    columns = ', '.join(FULLTEXT_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in FULLTEXT_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in FULLTEXT_COLUMNS)
+    delete_old = (
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return {
+        f'{SQLITE_FTS_TABLE}_ai':
+            f"AFTER INSERT ON {CANDIDATE_TABLE} BEGIN {insert_new} END",
+        f'{SQLITE_FTS_TABLE}_ad':
+            f"AFTER DELETE ON {CANDIDATE_TABLE} BEGIN {delete_old} END",
+        f'{SQLITE_FTS_TABLE}_au':
+            f"AFTER UPDATE OF {columns} ON {CANDIDATE_TABLE} BEGIN {delete_old} {insert_new} END",
+    }
+
+
+def install_fulltext_index(schema_editor):
+    """
+    Creates the database full-text index over FULLTEXT_COLUMNS for the current vendor.
+    Safe to re-run, e.g. after a migration rebuilt the candidate table and dropped its triggers.
+    """
+    vendor = schema_editor.connection.vendor
+    columns = ', '.join(FULLTEXT_COLUMNS)
+
+    if vendor == 'sqlite' and sqlite_fts5_available():
+        created = SQLITE_FTS_TABLE not in schema_editor.connection.introspection.table_names()
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+            f"{columns}, content='{CANDIDATE_TABLE}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+        )
+        for name, definition in sqlite_fts_triggers().items():
+            schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {definition}")
+        if created:
+            schema_editor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+    elif vendor == 'postgresql':
+        vector = ' || '.join(
+            f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+            for column, weight in FULLTEXT_COLUMNS.items()
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {CANDIDATE_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {CANDIDATE_TABLE}_search_vector ON {CANDIDATE_TABLE} USING GIN (search_vector)"
+        )
+
+
+def uninstall_fulltext_index(schema_editor):
+    """
+    Drops whatever install_fulltext_index created.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for name in sqlite_fts_triggers():
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"ALTER TABLE {CANDIDATE_TABLE} DROP COLUMN IF EXISTS search_vector")
+
+
+@contextmanager
+def sqlite_fts_triggers_suspended(connection):
+    """
+    Drops the FTS5 sync triggers for a bulk load, then indexes the rows inserted
+    meanwhile with one INSERT ... SELECT and restores the triggers. Per-row
+    trigger maintenance makes inserts about ten times slower. Only use this
+    while no other writer updates or deletes candidates.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor != 'sqlite' or SQLITE_FTS_TABLE not in connection.introspection.table_names(cursor):
+            yield
+            return
+
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {CANDIDATE_TABLE}")
+        last_indexed_id = cursor.fetchone()[0]
+        triggers = sqlite_fts_triggers()
+        for name in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        try:
+            yield
+        finally:
+            columns = ', '.join(FULLTEXT_COLUMNS)
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {columns}) "
+                f"SELECT id, {columns} FROM {CANDIDATE_TABLE} WHERE id > %s",
+                [last_indexed_id],
+            )
+            for name, definition in triggers.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {definition}")
+
+
+class IContainsSearchBackend:
+    """
+    Scores candidates with one `name__icontains` condition per search term.
+    Needs no index, but scans the whole table for every term.
+    """
+    name = 'icontains'
+    uses_token_index = False
+    # Matches the raw query terms, so 'José' and 'Jose' return different results.
+    normalizes_query = False
+    match_columns = ('name',)
+
+    def search(self, query):
+        search_terms = query.split()
+        # Build relevancy conditions for each term
+        conditions = [
+            Case(
+                When(name__icontains=term, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            for term in search_terms
+        ]
+
+        # Calculate relevancy score by summing up the conditions
+        relevancy_annotation = sum(conditions)
+        # Apply threshold: only candidates matching at least one term are returned
+        queryset = Candidate.objects.annotate(relevancy=relevancy_annotation)
+        return queryset.filter(relevancy__gte=1).order_by('-relevancy', 'id')
+
+    def match(self, terms):
+        """
+        Returns the unranked candidates whose name contains any of the terms.
+        """
+        return Candidate.objects.filter(reduce(operator.or_, (Q(name__icontains=term) for term in terms)))
+
+
+class PrefixSearchBackend:
+    """
+    Scores candidates like the icontains backend, but matches each term as a
+    token prefix against the precomputed `search_tokens` column: no per-row case
+    folding, and accent-insensitive, but no faster: a term may prefix any token
+    of the name, so the `LIKE '% term%'` match scans the table like icontains.
+    Indexed lookups need the token or full-text backends.
+    """
+    name = 'prefix'
+    uses_token_index = False
+    normalizes_query = True
+    match_columns = ('name',)
+
+    def search(self, query):
+        terms = query_terms(query)
+        if not terms:
+            return Candidate.objects.none()
+
+        relevancy = sum(
+            Case(When(self.term_condition(term), then=Value(1)), default=Value(0), output_field=IntegerField())
+            for term in terms
+        )
+        return self.match(terms).annotate(relevancy=relevancy).order_by('-relevancy', 'id')
+
+    def match(self, terms):
+        """
+        Returns the unranked candidates with a name token starting with any of the terms.
+        """
+        return Candidate.objects.filter(reduce(operator.or_, (self.term_condition(term) for term in terms)))
+
+    def term_condition(self, term):
+        return Q(search_tokens__contains=f' {term}')
+
+
+class TokenIndexSearchBackend:
+    """
+    Scores candidates from the `CandidateNameToken` posting lists: relevancy is
+    the number of distinct query terms that are a token (or token prefix) of
+    the candidate's name.
+    """
+    name = 'token'
+    uses_token_index = True
+    normalizes_query = True
+    match_columns = ('name',)
+
+    def search(self, query):
+        terms = query_terms(query)
+        if not terms:
+            return Candidate.objects.none()
+
+        return (
+            Candidate.objects
+            .filter(name_tokens__key__in=terms)
+            .annotate(relevancy=Count('name_tokens'))
+            .order_by('-relevancy', 'id')
+        )
+
+    def match(self, terms):
+        """
+        Returns the unranked candidates with a name token (or prefix) among the terms.
+        """
+        return Candidate.objects.filter(
+            id__in=CandidateNameToken.objects.filter(key__in=terms).values('candidate_id')
+        )
+
+
+class SQLiteFTSSearchBackend:
+    """
+    Ranks candidates with BM25 inside SQLite, using the FTS5 table kept in sync
+    with the candidate table by triggers.
+    """
+    name = 'fts5'
+    uses_token_index = False
+    normalizes_query = True
+    # Columns `match` can search.
+    match_columns = tuple(FULLTEXT_COLUMNS)
+
+    def search(self, query, columns=('name',)):
+        terms = query_terms(query)
+        if not terms:
+            return Candidate.objects.none()
+
+        weights = ', '.join('1.0' if column in columns else '0.0' for column in FULLTEXT_COLUMNS)
+        return (
+            self.match(terms, columns)
+            # bm25() is lower for better matches; negate it so relevancy sorts like the other backends.
+            # A real annotation (rather than an extra select) can also be filtered on, e.g. by keyset pagination.
+            .annotate(relevancy=RawSQL(f'-bm25({SQLITE_FTS_TABLE}, {weights})', [], output_field=FloatField()))
+            .order_by('-relevancy', 'id')
+        )
+
+    def match(self, terms, columns=('name',)):
+        """
+        Returns the unranked candidates matching any of the terms as a prefix.
+        """
+        # Quote every term so FTS5 syntax characters are matched literally, then prefix-match it.
+        expression = ' OR '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        match = '{%s} : (%s)' % (' '.join(columns), expression)
+        return Candidate.objects.extra(
+            tables=[SQLITE_FTS_TABLE],
+            where=[f'{SQLITE_FTS_TABLE}.rowid = {CANDIDATE_TABLE}.id', f'{SQLITE_FTS_TABLE} MATCH %s'],
+            params=[match],
+        )
+
+
+class PostgresSearchBackend:
+    """
+    Ranks candidates with ts_rank inside PostgreSQL, over the generated and
+    GIN-indexed `search_vector` column.
+    """
+    name = 'postgres'
+    uses_token_index = False
+    normalizes_query = True
+    # Columns `match` can search.
+    match_columns = tuple(FULLTEXT_COLUMNS)
+
+    def search(self, query, columns=('name',)):
+        from django.contrib.postgres.search import SearchRank
+
+        terms = query_terms(query)
+        if not terms:
+            return Candidate.objects.none()
+
+        search_vector, search_query = self.expressions(terms, columns)
+        return (
+            self.match(terms, columns)
+            .annotate(relevancy=SearchRank(search_vector, search_query))
+            .order_by('-relevancy', 'id')
+        )
+
+    def match(self, terms, columns=('name',)):
+        """
+        Returns the unranked candidates matching any of the terms as a prefix.
+        """
+        search_vector, search_query = self.expressions(terms, columns)
+        return Candidate.objects.alias(search_vector=search_vector).filter(search_vector=search_query)
+
+    def expressions(self, terms, columns):
+        from django.contrib.postgres.search import SearchQuery, SearchVectorField
+
+        # Tokens only hold word characters, so they are safe inside a raw tsquery.
+        labels = ''.join(FULLTEXT_COLUMNS[column] for column in columns)
+        search_query = SearchQuery(
+            ' | '.join(f'{term}:*{labels}' for term in terms), config='simple', search_type='raw'
+        )
+        search_vector = RawSQL(f'{CANDIDATE_TABLE}.search_vector', [], output_field=SearchVectorField())
+        return search_vector, search_query
+
+
+SEARCH_BACKENDS = {
+    backend.name: backend
+    for backend in (
+        IContainsSearchBackend, PrefixSearchBackend, TokenIndexSearchBackend, SQLiteFTSSearchBackend, PostgresSearchBackend,
+    )
+}
+
+
+def default_search_backend_name():
+    """
+    Picks the full-text backend matching DATABASES['default']['ENGINE'],
+    falling back to the token index when the database has none: it serves
+    every term from the index on (key, candidate), where the prefix backend scans.
+    """
+    engine = settings.DATABASES['default']['ENGINE']
+    if engine == 'django.db.backends.sqlite3' and sqlite_fts5_available():
+        return SQLiteFTSSearchBackend.name
+    if engine == 'django.db.backends.postgresql':
+        return PostgresSearchBackend.name
+    return TokenIndexSearchBackend.name
+
+
+def get_search_backend():
+    """
+    Returns the search backend configured in `CANDIDATE_SEARCH['BACKEND']`;
+    'auto' selects one from the database engine.
+    """
+    name = getattr(settings, 'CANDIDATE_SEARCH', {}).get('BACKEND', 'auto')
+    if name == 'auto':
+        name = default_search_backend_name()
+    try:
+        return SEARCH_BACKENDS[name]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown candidate search backend {name!r}. Choose one of: {', '.join(SEARCH_BACKENDS)}."
+        )
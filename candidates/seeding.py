@@ -0,0 +1,59 @@
+"""
+Row generation for `seed_candidates --fast`. Kept free of model imports, so
+worker processes started with spawn or forkserver can import it before
+Django is set up.
+"""
+import random
+
+import django
+
+from .text import search_fields
+
+
+GENDERS = ['M', 'F', 'O']
+
+# Column pools shared with fast-mode worker processes (see init_pools).
+POOLS = {}
+
+
+def init_pools(first_names, last_names, domains, updated_at):
+    POOLS.update(first_names=first_names, last_names=last_names, domains=domains, updated_at=updated_at)
+
+
+def init_worker_pools(*pools):
+    """
+    Initializes a worker process: sets Django up, which spawned workers have not, then the pools.
+    """
+    django.setup()
+    init_pools(*pools)
+
+
+def generate_batch(start_id, size):
+    """
+    Builds `size` candidate rows as plain tuples from the precomputed pools.
+    Emails embed the row id, so they are unique without any bookkeeping.
+    """
+    rng = random.Random(start_id)
+    first_names = rng.choices(POOLS['first_names'], k=size)
+    last_names = rng.choices(POOLS['last_names'], k=size)
+    domains = rng.choices(POOLS['domains'], k=size)
+    ages = rng.choices(range(20, 51), k=size)
+    genders = rng.choices(GENDERS, k=size)
+    phones = [str(rng.randrange(2000000000, 10000000000)) for _ in range(size)]
+
+    rows = []
+    for i in range(size):
+        name = f'{first_names[i]} {last_names[i]}'
+        normalized = search_fields(name)
+        rows.append((
+            start_id + i,
+            name,
+            ages[i],
+            genders[i],
+            f'{first_names[i]}.{last_names[i]}.{start_id + i}@{domains[i]}'.lower(),
+            phones[i],
+            POOLS['updated_at'],
+            1,
+            normalized['search_tokens'],
+        ))
+    return rows
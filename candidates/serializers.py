@@ -1,10 +1,39 @@
+from pathlib import Path
+
 from rest_framework import serializers
-from .models import Candidate
+from .models import Candidate, CandidateJob
+from .cache import bump_candidates_version
+from .search import sync_search_indexes
+from recruiter_ats.metrics import timer
 
+from django.conf import settings
 from django.core.validators import EmailValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.utils import timezone
 from rest_framework import serializers
 
 
+def age_category(age):
+    """
+    Categorizes age into Young, Mid-level, or Senior.
+    """
+    if age < 25:
+        return "Young"
+    elif 25 <= age < 40:
+        return "Mid-level"
+    return "Senior"
+
+
+# Database-side equivalent of age_category(), for `.values()`-based read paths.
+AGE_CATEGORY_EXPRESSION = Case(
+    When(age__lt=25, then=Value("Young")),
+    When(age__lt=40, then=Value("Mid-level")),
+    default=Value("Senior"),
+    output_field=CharField(),
+)
+
+
 class CandidateSerializer(serializers.ModelSerializer):
     """
     Serializer for the Candidate model with additional computed fields and validations.
@@ -20,15 +49,15 @@ class CandidateSerializer(serializers.ModelSerializer):
             'phone_number': {'required': True, 'min_length': 10, 'max_length': 15},
         }
 
+    def to_representation(self, instance):
+        with timer("serialize"):
+            return super().to_representation(instance)
+
     def get_age_category(self, obj):
         """
         Categorizes age into Young, Mid-level, or Senior.
         """
-        if obj.age < 25:
-            return "Young"
-        elif 25 <= obj.age < 40:
-            return "Mid-level"
-        return "Senior"
+        return age_category(obj.age)
 
     def validate_email(self, value):
         """
@@ -72,7 +101,372 @@ class CandidateSerializer(serializers.ModelSerializer):
         return data
 
 
-class CandidateSearchSerializer(serializers.Serializer):
+class CandidateReadSerializer:
+    """
+    Read-only fast path producing the same output as CandidateSerializer for
+    rows fetched with `values()`, skipping model instances and DRF fields.
+    `age_category` is computed by the database (see AGE_CATEGORY_EXPRESSION).
+    """
+    fields = CandidateSerializer.Meta.fields
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def prepare(cls, queryset):
+        """
+        Turns a Candidate queryset into the `values()` rows this serializer reads.
+        Annotations such as `relevancy` are kept for pagination but not serialized;
+        `alias()` entries cannot be selected and are left out.
+        """
+        model_fields = [field for field in cls.fields if field != "age_category"]
+        return queryset.values(*model_fields, *queryset.query.annotation_select, age_category=AGE_CATEGORY_EXPRESSION)
+
+    @property
+    def data(self):
+        fields = self.fields
+        with timer("serialize"):
+            return [{field: row[field] for field in fields} for row in self.rows]
+
+
+class CandidateBulkCreateListSerializer(serializers.ListSerializer):
+    """
+    List serializer that checks email uniqueness for the whole payload with a
+    single query and inserts the candidates with batched `bulk_create`.
+    """
+    unique_email_message = "candidate with this email already exists."
+    duplicate_email_message = "Email is repeated earlier in this request."
+
+    def to_internal_value(self, data):
+        """
+        Validates every row and reports errors per row, aligned with the input list.
+        """
+        try:
+            validated_data = super().to_internal_value(data)
+            errors = [{} for _ in validated_data]
+        except serializers.ValidationError as exc:
+            if not isinstance(exc.detail, list):
+                raise
+            validated_data, errors = None, exc.detail
+
+        emails = [item.get("email") if isinstance(item, dict) else None for item in data]
+        existing = set(
+            Candidate.objects.filter(email__in=[email for email in emails if email]).values_list("email", flat=True)
+        )
+        seen = set()
+        for index, email in enumerate(emails):
+            if not email or "email" in errors[index]:
+                continue
+            if email in existing:
+                errors[index]["email"] = [self.unique_email_message]
+            elif email in seen:
+                errors[index]["email"] = [self.duplicate_email_message]
+            seen.add(email)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated_data
+
+    def create(self, validated_data):
+        """
+        Inserts all candidates in one transaction, `BATCH_SIZE` rows per INSERT.
+        """
+        batch_size = settings.CANDIDATE_BULK["BATCH_SIZE"]
+        candidates = [Candidate(**item) for item in validated_data]
+        try:
+            with transaction.atomic():
+                created = Candidate.objects.bulk_create(candidates, batch_size=batch_size)
+                sync_search_indexes(created)
+                bump_candidates_version()
+        except IntegrityError:
+            # Another request inserted one of the emails after validation ran.
+            raise serializers.ValidationError({"detail": "One or more emails already exist."})
+        return created
+
+
+class CandidateBulkCreateSerializer(CandidateSerializer):
+    """
+    Row serializer for bulk creation. Email uniqueness is checked once for the
+    whole list by CandidateBulkCreateListSerializer instead of per row.
+    """
+    class Meta(CandidateSerializer.Meta):
+        list_serializer_class = CandidateBulkCreateListSerializer
+        extra_kwargs = {
+            **CandidateSerializer.Meta.extra_kwargs,
+            'email': {'required': True, 'validators': []},
+        }
+
+
+class CandidateBatchGetSerializer(serializers.Serializer):
+    """
+    Validates a lookup of many candidates by id or by email, and resolves it
+    through the fast read path with one query per BATCH_SIZE keys.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        help_text="Ids of the candidates to fetch.",
+    )
+    emails = serializers.ListField(
+        # Not validated as emails: a malformed one is simply reported as not found.
+        child=serializers.CharField(max_length=254),
+        required=False,
+        allow_empty=False,
+        help_text="Emails of the candidates to fetch (exact match).",
+    )
+
+    def validate(self, data):
+        """
+        Object-level validation: exactly one key list, of at most MAX_ITEMS distinct keys.
+        """
+        data = super().validate(data)
+        if ("ids" in data) == ("emails" in data):
+            raise serializers.ValidationError({"detail": "Provide either 'ids' or 'emails'."})
+
+        field, keys = ("id", data["ids"]) if "ids" in data else ("email", data["emails"])
+        keys = list(dict.fromkeys(keys))
+        max_items = settings.CANDIDATE_BATCH_GET["MAX_ITEMS"]
+        if len(keys) > max_items:
+            raise serializers.ValidationError({"detail": f"At most {max_items} candidates can be fetched per request."})
+        return {"field": field, "keys": keys}
+
+    def resolve(self):
+        """
+        Returns the rows of the candidates found, in request order, and the keys matching none.
+        """
+        field, keys = self.validated_data["field"], self.validated_data["keys"]
+        batch_size = settings.CANDIDATE_BATCH_GET["BATCH_SIZE"]
+        found = {}
+        for start in range(0, len(keys), batch_size):
+            queryset = Candidate.objects.filter(**{f"{field}__in": keys[start:start + batch_size]})
+            found.update((row[field], row) for row in CandidateReadSerializer.prepare(queryset))
+        return [found[key] for key in keys if key in found], [key for key in keys if key not in found]
+
+
+class CandidateBulkTargetSerializer(serializers.Serializer):
+    """
+    Selects the candidates of a bulk update or delete, by id list or by filter,
+    and applies a write to them in batches inside one transaction.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        help_text="Ids of the candidates to write. Unknown ids are reported as 'not_found'.",
+    )
+    filter = serializers.DictField(
+        required=False,
+        help_text="gender / age_min / age_max filter selecting the candidates to write.",
+    )
+
+    def validate_filter(self, value):
+        """
+        Validates the filter like the list filters, refusing one that matches everything.
+        """
+        filter_serializer = CandidateFilterSerializer(data=value)
+        filter_serializer.is_valid(raise_exception=True)
+        if not filter_serializer.validated_data:
+            raise serializers.ValidationError("Filter must contain at least one of gender, age_min or age_max.")
+        return filter_serializer.validated_data
+
+    def validate(self, data):
+        """
+        Object-level validation: exactly one selector, resolved to at most MAX_ITEMS ids.
+        """
+        data = super().validate(data)
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError({"detail": "Provide either 'ids' or 'filter'."})
+
+        max_items = settings.CANDIDATE_BULK["MAX_ITEMS"]
+        if "ids" in data:
+            data["ids"] = list(dict.fromkeys(data["ids"]))
+        else:
+            queryset = CandidateFilterSerializer.filter_queryset(Candidate.objects.order_by("id"), data["filter"])
+            data["ids"] = list(queryset.values_list("id", flat=True)[:max_items + 1])
+        if len(data["ids"]) > max_items:
+            raise serializers.ValidationError({"detail": f"At most {max_items} candidates can be written per request."})
+        return data
+
+    def apply(self, write, outcome):
+        """
+        Runs `write(queryset)` on every batch of existing target candidates (locked
+        first) in one transaction, and returns the outcome of every requested id.
+        """
+        ids = self.validated_data["ids"]
+        batch_size = settings.CANDIDATE_BULK["BATCH_SIZE"]
+        found = set()
+        with transaction.atomic():
+            for start in range(0, len(ids), batch_size):
+                batch = Candidate.objects.select_for_update().filter(id__in=ids[start:start + batch_size])
+                batch_ids = list(batch.values_list("id", flat=True))
+                write(Candidate.objects.filter(id__in=batch_ids), batch_ids)
+                found.update(batch_ids)
+            bump_candidates_version()
+        return [{"id": pk, "status": outcome if pk in found else "not_found"} for pk in ids]
+
+
+class CandidateBulkUpdateSerializer(CandidateBulkTargetSerializer):
+    """
+    Validates one set of changes for every selected candidate, which is then
+    applied with one UPDATE statement per batch.
+    """
+    changes = serializers.DictField(help_text="Fields to set on every selected candidate.")
+
+    def validate_changes(self, value):
+        """
+        Validates the changes once, with the single-candidate rules.
+        """
+        if not value:
+            raise serializers.ValidationError("No changes provided.")
+        if "email" in value:
+            raise serializers.ValidationError({"email": ["Emails are unique; update them one candidate at a time."]})
+        writable = set(CandidateSerializer.Meta.fields) - {"id", "age_category"}
+        unknown = sorted(set(value) - writable)
+        if unknown:
+            raise serializers.ValidationError({field: ["This field cannot be updated."] for field in unknown})
+
+        change_serializer = CandidateSerializer(data=value, partial=True)
+        change_serializer.is_valid(raise_exception=True)
+        return dict(change_serializer.validated_data)
+
+    def save(self):
+        changes = self.validated_data["changes"]
+
+        def update(queryset, ids):
+            queryset.update(**changes, updated_at=timezone.now(), version=F("version") + 1)
+            if "name" in changes:
+                sync_search_indexes([Candidate(id=pk, name=changes["name"]) for pk in ids])
+
+        return self.apply(update, "updated")
+
+
+class CandidateBulkDeleteSerializer(CandidateBulkTargetSerializer):
+    """
+    Deletes the selected candidates in batches.
+    """
+    def save(self):
+        return self.apply(lambda queryset, ids: queryset.delete(), "deleted")
+
+
+class CandidateDeleteJobSerializer(CandidateBulkTargetSerializer):
+    """
+    Selects the candidates of a background bulk delete. Unlike the bulk API there
+    is no MAX_ITEMS limit: the job resolves and deletes them in batches.
+    """
+    def validate(self, data):
+        """
+        Object-level validation: exactly one selector.
+        """
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError({"detail": "Provide either 'ids' or 'filter'."})
+        if "ids" in data:
+            data["ids"] = list(dict.fromkeys(data["ids"]))
+        return data
+
+
+class CandidateImportJobSerializer(serializers.Serializer):
+    """
+    Validates the file of a background import, which must be in CANDIDATE_JOBS['IMPORT_DIR'].
+    """
+    path = serializers.CharField(help_text="NDJSON or CSV file, relative to the import directory.")
+    format = serializers.ChoiceField(
+        choices=["ndjson", "csv"],
+        required=False,
+        help_text="File format. Defaults to the file extension.",
+    )
+
+    def validate_path(self, value):
+        """
+        Field-level validation: the file exists and does not escape the import directory.
+        """
+        import_dir = Path(settings.CANDIDATE_JOBS["IMPORT_DIR"]).resolve()
+        path = (import_dir / value).resolve()
+        if not path.is_relative_to(import_dir):
+            raise serializers.ValidationError("Path must be inside the import directory.")
+        if not path.is_file():
+            raise serializers.ValidationError("File does not exist.")
+        return str(path.relative_to(import_dir))
+
+
+class CandidateJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for background candidate jobs: submitted with a kind and its
+    parameters, then polled for status and progress.
+    """
+    class Meta:
+        model = CandidateJob
+        fields = [
+            'id', 'kind', 'params', 'status', 'progress', 'total', 'attempts', 'cancel_requested',
+            'result', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [field for field in fields if field not in ('kind', 'params')]
+
+    def validate(self, data):
+        """
+        Object-level validation of the parameters, with the rules of the kind of job.
+        """
+        params_serializer_class = self.get_params_serializer_class(data["kind"])
+        params_serializer = params_serializer_class(data=data.get("params", {}))
+        if not params_serializer.is_valid():
+            raise serializers.ValidationError({"params": params_serializer.errors})
+        data["params"] = dict(params_serializer.validated_data)
+        return data
+
+    @staticmethod
+    def get_params_serializer_class(kind):
+        return {
+            CandidateJob.IMPORT: CandidateImportJobSerializer,
+            CandidateJob.EXPORT: CandidateExportSerializer,
+            CandidateJob.BULK_DELETE: CandidateDeleteJobSerializer,
+        }.get(kind, serializers.Serializer)
+
+
+class CandidateFilterSerializer(serializers.Serializer):
+    """
+    Serializer for validating the candidate filter query parameters, which the
+    (gender, age) index serves.
+    """
+    gender = serializers.ChoiceField(
+        choices=[choice for choice, _ in Candidate.GENDER_CHOICES],
+        required=False,
+        help_text="Only candidates of this gender ('M', 'F' or 'O').",
+    )
+    age_min = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        help_text="Only candidates at least this old.",
+    )
+    age_max = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        help_text="Only candidates at most this old.",
+    )
+
+    def validate(self, data):
+        """
+        Object-level validation for the age range.
+        """
+        data = super().validate(data)
+        if data.get("age_min") is not None and data.get("age_max") is not None and data["age_min"] > data["age_max"]:
+            raise serializers.ValidationError({"age_min": "age_min cannot be greater than age_max."})
+        return data
+
+    @staticmethod
+    def filter_queryset(queryset, validated_data):
+        """
+        Applies the validated filters to a Candidate queryset.
+        """
+        if "gender" in validated_data:
+            queryset = queryset.filter(gender=validated_data["gender"])
+        if "age_min" in validated_data:
+            queryset = queryset.filter(age__gte=validated_data["age_min"])
+        if "age_max" in validated_data:
+            queryset = queryset.filter(age__lte=validated_data["age_max"])
+        return queryset
+
+
+class CandidateSearchSerializer(CandidateFilterSerializer):
     """
     Serializer for validating query parameters for candidate search API.
     """
@@ -98,6 +492,31 @@ class CandidateSearchSerializer(serializers.Serializer):
         default=10,
         help_text="Number of items per page. Default is 10. Maximum is 100.",
     )
+    count = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Whether to compute the exact total number of matches. Default is false.",
+    )
+    pagination = serializers.ChoiceField(
+        choices=["page", "cursor"],
+        required=False,
+        default="page",
+        help_text="'page' for page-number pagination, 'cursor' for keyset pagination without a depth limit.",
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text="Opaque position returned in the 'next' link of a cursor-paginated response.",
+    )
+    fuzzy = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Whether to also match names with terms close to the query terms, e.g. misspellings. Default is false.",
+    )
+    facets = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Whether to include the number of matches per gender and age category. Default is false.",
+    )
 
     def validate_q(self, value):
         """
@@ -107,17 +526,95 @@ class CandidateSearchSerializer(serializers.Serializer):
             raise serializers.ValidationError("Search query cannot be numeric.")
         return value
 
+    @staticmethod
+    def facet_queryset(queryset):
+        """
+        Groups the matched candidates by gender and age category, so that every
+        facet is counted by one aggregate query. Ranking annotations and ordering
+        are dropped; candidates joined to several index rows are counted once.
+        """
+        return (
+            queryset.order_by()
+            .values("gender", age_category=AGE_CATEGORY_EXPRESSION)
+            .annotate(total=Count("id", distinct=True))
+        )
+
+    @staticmethod
+    def fold_facets(rows):
+        """
+        Sums `facet_queryset()` rows into counts per gender and per age category,
+        listing every value, including those without matches.
+        """
+        facets = {
+            "gender": dict.fromkeys([choice for choice, _ in Candidate.GENDER_CHOICES], 0),
+            "age_category": dict.fromkeys(["Young", "Mid-level", "Senior"], 0),
+        }
+        for row in rows:
+            facets["gender"][row["gender"]] += row["total"]
+            facets["age_category"][row["age_category"]] += row["total"]
+        return facets
+
     def validate(self, data):
         """
         Object-level validation for pagination constraints or business rules.
         """
+        data = super().validate(data)
         page = data.get("page", 1)
         page_size = data.get("page_size", 10)
 
-        # Example: Restrict maximum result limits
-        if page * page_size > 10000:
+        # Example: Restrict maximum result limits (keyset pages cost the same at any depth)
+        if data.get("pagination") == "page" and page * page_size > 10000:
             raise serializers.ValidationError(
                 {"detail": "Pagination limits exceeded. Try reducing page size or page number."}
             )
 
-        return data
\ No newline at end of file
+        return data
+
+
+class CandidateChangesSerializer(serializers.Serializer):
+    """
+    Serializer for validating query parameters for the candidate change feed.
+    """
+    since = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        default=0,
+        help_text="Only changes with a higher sequence: the last sequence already processed. Default is 0.",
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="Maximum number of changes returned. Defaults to CANDIDATE_CHANGES['PAGE_SIZE'].",
+    )
+
+    def validate_limit(self, value):
+        """
+        Field-level validation for the page size.
+        """
+        max_page_size = settings.CANDIDATE_CHANGES["MAX_PAGE_SIZE"]
+        if value > max_page_size:
+            raise serializers.ValidationError(f"Limit cannot exceed {max_page_size}.")
+        return value
+
+
+class CandidateExportSerializer(CandidateFilterSerializer):
+    """
+    Serializer for validating query parameters for the candidate export API.
+    """
+    format = serializers.ChoiceField(
+        choices=["ndjson", "csv"],
+        required=False,
+        default="ndjson",
+        help_text="Export file format. Default is ndjson.",
+    )
+    q = serializers.CharField(
+        max_length=255,
+        required=False,
+        help_text="Optional search query; only matching candidates are exported, by relevancy.",
+    )
+
+    def validate_q(self, value):
+        """
+        Field-level validation for the query string.
+        """
+        return CandidateSearchSerializer().validate_q(value)
@@ -0,0 +1,61 @@
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_candidates_version
+from .models import Candidate, CandidateChange
+from .search import sync_search_indexes
+from .utils import apply_sqlite_pragmas
+
+
+@receiver(post_save, sender=Candidate)
+def update_name_token_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    """
+    Keeps the fuzzy-search vocabulary, and the name token index while the token
+    backend is active, in sync with saved candidates. Deleted candidates drop
+    their tokens through the cascading foreign key.
+    """
+    if raw or (update_fields is not None and 'name' not in update_fields):
+        return
+    sync_search_indexes([instance])
+
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def invalidate_candidate_caches(sender, origin=None, **kwargs):
+    """
+    Bumps the candidate table version so cached search results are never served
+    stale. Queryset deletions bump it once for all their candidates (see
+    CandidateQuerySet.delete) rather than once per row.
+    """
+    if isinstance(origin, QuerySet):
+        return
+    bump_candidates_version()
+
+
+@receiver(post_save, sender=Candidate)
+def record_candidate_save(sender, instance, created, using, **kwargs):
+    """
+    Writes the outbox entry of a saved candidate, in the transaction of the save.
+    """
+    CandidateChange.record(CandidateChange.CREATE if created else CandidateChange.UPDATE, [instance.change_snapshot()], using)
+
+
+@receiver(post_delete, sender=Candidate)
+def record_candidate_delete(sender, instance, using, origin=None, **kwargs):
+    """
+    Writes the outbox entry of a deleted candidate. Queryset deletions record
+    all their candidates at once (see CandidateQuerySet.delete).
+    """
+    if isinstance(origin, QuerySet):
+        return
+    CandidateChange.record(CandidateChange.DELETE, [{'id': instance.pk}], using)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """
+    Applies the SQLITE_TUNING pragmas (WAL, mmap, cache size...) to every new SQLite connection.
+    """
+    apply_sqlite_pragmas(connection)
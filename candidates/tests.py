@@ -308,4 +308,1713 @@ class CandidateUpdateDeleteAPITest(TestCase):
         self.assertEqual(response.json()["error"], "An unexpected error occurred.")
         self.assertEqual(response.json()["detail"], "No Candidate matches the given query.")
     
-    
\ No newline at end of file
+    
+
+from django.test import override_settings
+from .models import CandidateNameToken
+
+
+@override_settings(CANDIDATE_SEARCH={'BACKEND': 'token'})
+class CandidateNameTokenIndexTest(TestCase):
+    def setUp(self):
+        """
+        Seed a candidate whose name tokens should be indexed on save.
+        """
+        self.candidate = Candidate.objects.create(
+            name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890"
+        )
+
+    def test_tokens_and_prefixes_indexed_on_create(self):
+        """
+        Test that every token and token prefix of the name is indexed.
+        """
+        keys = set(self.candidate.name_tokens.values_list("key", flat=True))
+        self.assertEqual(keys, {"a", "aj", "aja", "ajay", "k", "ku", "kum", "kuma", "kumar"})
+
+    def test_index_follows_rename(self):
+        """
+        Test that renaming a candidate replaces its index entries.
+        """
+        self.candidate.name = "Ravi Sharma"
+        self.candidate.save()
+        response = self.client.get('/api/candidates/search/?q=Ajay')
+        self.assertEqual(len(response.json()['results']), 0)
+        response = self.client.get('/api/candidates/search/?q=sharm')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["Ravi Sharma"])
+
+    def test_index_entries_removed_on_delete(self):
+        """
+        Test that deleting a candidate drops its index entries.
+        """
+        self.client.delete(f'/api/candidates/{self.candidate.id}/')
+        self.assertFalse(CandidateNameToken.objects.exists())
+
+    def test_search_is_case_insensitive(self):
+        """
+        Test that query terms are normalized like indexed tokens.
+        """
+        response = self.client.get('/api/candidates/search/?q=AJAY kUmAr')
+        self.assertEqual(response.json()['results'][0]['name'], "Ajay Kumar")
+
+    @override_settings(CANDIDATE_SEARCH={'BACKEND': 'icontains'})
+    def test_icontains_backend_matches_substrings(self):
+        """
+        Test that the icontains backend still matches inside tokens.
+        """
+        response = self.client.get('/api/candidates/search/?q=jay')
+        self.assertEqual(len(response.json()['results']), 1)
+
+
+from .search import SQLiteFTSSearchBackend, get_search_backend
+
+
+class CandidateFullTextSearchTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates whose names share tokens with other candidates' emails.
+        """
+        self.candidate = Candidate.objects.create(
+            name="José Kumar", age=30, gender="M", email="ravi.jose@example.com", phone_number="1234567890"
+        )
+        Candidate.objects.create(name="Ravi Sharma", age=35, gender="M", email="kumar@example.com", phone_number="1122334455")
+
+    def test_auto_backend_uses_fts5_on_sqlite(self):
+        """
+        Test that the SQLite engine selects the FTS5 backend automatically, and the token index without FTS5.
+        """
+        self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+        with mock.patch("candidates.search.sqlite_fts5_available", return_value=False):
+            self.assertEqual(get_search_backend().name, "token")
+
+    def test_search_matches_name_only(self):
+        """
+        Test that emails are mirrored into the index but not matched by name search.
+        """
+        response = self.client.get('/api/candidates/search/?q=kumar')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["José Kumar"])
+
+    def test_search_ignores_accents_and_matches_prefixes(self):
+        """
+        Test that the unicode61 tokenizer folds accents and terms match as prefixes.
+        """
+        response = self.client.get('/api/candidates/search/?q=jos')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["José Kumar"])
+
+    def test_index_follows_update_and_delete(self):
+        """
+        Test that the triggers keep the FTS table in sync with writes.
+        """
+        self.client.patch(f'/api/candidates/{self.candidate.id}/', data={"name": "Arjun Mehta"}, content_type="application/json")
+        self.assertEqual(len(self.client.get('/api/candidates/search/?q=jose').json()['results']), 0)
+        self.assertEqual(len(self.client.get('/api/candidates/search/?q=arjun').json()['results']), 1)
+
+        self.client.delete(f'/api/candidates/{self.candidate.id}/')
+        self.assertEqual(len(self.client.get('/api/candidates/search/?q=arjun').json()['results']), 0)
+
+    def test_fts_query_syntax_is_escaped(self):
+        """
+        Test that FTS5 operators in the query are matched literally instead of raising.
+        """
+        response = self.client.get('/api/candidates/search/?q=kumar" OR NEAR(')
+        self.assertEqual(response.status_code, 200)
+
+
+class CandidateSearchPaginationTest(TestCase):
+    def setUp(self):
+        """
+        Seed more matching candidates than fit on one page.
+        """
+        for i in range(5):
+            Candidate.objects.create(
+                name=f"Ajay Candidate{i}", age=30, gender="M", email=f"ajay{i}@example.com", phone_number="1234567890"
+            )
+
+    def test_search_page_runs_single_query(self):
+        """
+        Test that a search page is loaded without an exists() check or COUNT(*).
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/candidates/search/?q=Ajay&page_size=2')
+        json_response = response.json()
+        self.assertEqual(len(json_response['results']), 2)
+        self.assertIsNone(json_response['count'])
+        self.assertIn("page=2", json_response['next'])
+
+    def test_exact_count_on_request(self):
+        """
+        Test that count=true adds one COUNT query and returns the total.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/candidates/search/?q=Ajay&page_size=2&count=true')
+        self.assertEqual(response.json()['count'], 5)
+
+    def test_last_page_count_known_without_query(self):
+        """
+        Test that the last page reports the total without counting.
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/candidates/search/?q=Ajay&page=3&page_size=2')
+        json_response = response.json()
+        self.assertEqual(json_response['count'], 5)
+        self.assertIsNone(json_response['next'])
+        self.assertEqual(len(json_response['results']), 1)
+
+    def test_invalid_count_parameter(self):
+        """
+        Test that a non-boolean count parameter is rejected.
+        """
+        response = self.client.get('/api/candidates/search/?q=Ajay&count=maybe')
+        self.assertEqual(response.status_code, 400)
+
+
+from base64 import urlsafe_b64encode
+
+
+class CandidateKeysetPaginationTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates with a mix of relevancy scores for the same query.
+        """
+        names = ["Ajay Kumar", "Kumar Yadav", "Ajay Kumar Yadav", "Ravi Sharma", "Ajay Singh", "Kumar Ajay Rao", "Kumar"]
+        for i, name in enumerate(names):
+            Candidate.objects.create(name=name, age=30, gender="M", email=f"c{i}@example.com", phone_number="1234567890")
+
+    def walk(self, url):
+        """
+        Follows `next` links and returns every result served.
+        """
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            results.extend(response.json()['results'])
+            url = response.json()['next']
+        return results
+
+    def test_search_cursor_walk_matches_ranked_order(self):
+        """
+        Test that walking search cursors yields the same order as a single large page.
+        """
+        expected = self.client.get('/api/candidates/search/?q=Ajay Kumar&page_size=100').json()['results']
+        walked = self.walk('/api/candidates/search/?q=Ajay Kumar&pagination=cursor&page_size=2')
+        self.assertEqual([r['id'] for r in walked], [r['id'] for r in expected])
+        self.assertEqual(len(walked), 6)
+
+    def test_cursor_pagination_ignores_depth_limit(self):
+        """
+        Test that the OFFSET depth limit does not apply to cursor pagination.
+        """
+        response = self.client.get('/api/candidates/search/?q=Ajay&pagination=cursor&page=200&page_size=100')
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_walks_all_candidates_in_id_order(self):
+        """
+        Test that the list endpoint serves every candidate once, ordered by id.
+        """
+        walked = self.walk('/api/candidates/?page_size=3')
+        self.assertEqual([r['id'] for r in walked], list(Candidate.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_list_page_runs_single_query(self):
+        """
+        Test that a list page needs neither OFFSET nor COUNT(*).
+        """
+        first = self.client.get('/api/candidates/?page_size=3').json()
+        with self.assertNumQueries(1):
+            response = self.client.get(first['next'])
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor is rejected.
+        """
+        response = self.client.get('/api/candidates/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_values(self):
+        """
+        Test that cursors holding values of the wrong type for their ordering fields are rejected with 404.
+        """
+        def cursor(position):
+            return urlsafe_b64encode(position.encode()).decode()
+
+        for position in ['["abc"]', '[{"a": 1}]', '[null]', '[true]', '[1.5]', '[[1]]', '[99999999999999999999999]']:
+            with self.subTest(position=position):
+                response = self.client.get('/api/candidates/', {"cursor": cursor(position)})
+                self.assertEqual(response.status_code, 404)
+        for position in ['["abc", 1]', '[1.0, "x"]', '[null, null]', '[NaN, 1]', '[1, 2.5]', '[99999999999999999999999, 1]']:
+            with self.subTest(position=position):
+                response = self.client.get(
+                    '/api/candidates/search/', {"q": "Ajay", "pagination": "cursor", "cursor": cursor(position)}
+                )
+                self.assertEqual(response.status_code, 404)
+
+        response = self.client.get('/api/candidates/search/', {"q": "Ajay", "pagination": "cursor", "cursor": cursor('[1.5, 1]')})
+        self.assertEqual(response.status_code, 200)
+
+
+from .search import index_name_vocabulary
+
+
+class CandidateBulkCreateAPITest(TestCase):
+    def setUp(self):
+        """
+        Set up the API client and an existing candidate to collide with.
+        """
+        self.client = APIClient()
+        Candidate.objects.create(name="Ravi Sharma", age=35, gender="M", email="ravi@example.com", phone_number="1122334455")
+
+    def payload(self, count, start=0):
+        return [
+            {"name": f"Bulk Candidate{i}", "age": 30, "gender": "F", "email": f"bulk{i}@example.com", "phone_number": "1234567890"}
+            for i in range(start, start + count)
+        ]
+
+    def test_bulk_create_success(self):
+        """
+        Test that a valid array is inserted with one uniqueness query and batched INSERTs.
+        """
+        payload = self.payload(50)
+        index_name_vocabulary(row["name"] for row in payload)
+        # One email lookup, then SAVEPOINT, a single 50-row INSERT, its 50 outbox
+        # entries, the lookup of the (already known) name tokens in the fuzzy
+        # vocabulary and RELEASE.
+        with self.settings(CANDIDATE_BULK={'MAX_ITEMS': 100, 'BATCH_SIZE': 50}):
+            with self.assertNumQueries(6):
+                response = self.client.post('/api/candidates/bulk/', data=payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["created"], 50)
+        self.assertEqual(Candidate.objects.filter(email__startswith="bulk").count(), 50)
+
+    def test_bulk_create_reports_errors_per_row(self):
+        """
+        Test that invalid rows are reported at their index and nothing is inserted.
+        """
+        rows = self.payload(4)
+        rows[1]["age"] = 10
+        rows[2]["email"] = "ravi@example.com"
+        rows[3]["email"] = rows[0]["email"]
+        response = self.client.post('/api/candidates/bulk/', data=rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.json()["error"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("age", errors[1])
+        self.assertIn("already exists", errors[2]["email"][0])
+        self.assertIn("repeated", errors[3]["email"][0])
+        self.assertEqual(Candidate.objects.count(), 1)
+
+    def test_bulk_create_limits(self):
+        """
+        Test that empty and oversized payloads are rejected.
+        """
+        response = self.client.post('/api/candidates/bulk/', data=[], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.settings(CANDIDATE_BULK={'MAX_ITEMS': 2, 'BATCH_SIZE': 2}):
+            response = self.client.post('/api/candidates/bulk/', data=self.payload(3), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_created_candidates_are_searchable(self):
+        """
+        Test that bulk inserts reach the search index.
+        """
+        self.client.post('/api/candidates/bulk/', data=self.payload(3), format='json')
+        response = self.client.get('/api/candidates/search/?q=Candidate1')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["Bulk Candidate1"])
+
+
+class CandidateBulkUpdateDeleteAPITest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates to update and delete in bulk.
+        """
+        self.client = APIClient()
+        self.ids = [
+            Candidate.objects.create(
+                name=f"Ajay Bulk{i}", age=20 + i, gender="M" if i % 2 else "F", email=f"bulkedit{i}@example.com",
+                phone_number="1234567890",
+            ).id
+            for i in range(6)
+        ]
+
+    def test_bulk_update_by_ids(self):
+        """
+        Test that changes are applied with one SELECT and one UPDATE per batch, with per-id outcomes.
+        """
+        # SAVEPOINT, then per batch of 2 a locking SELECT, the UPDATE (with the SELECTs
+        # of its ids and updated rows) and the INSERT of its outbox entries, and RELEASE.
+        with self.settings(CANDIDATE_BULK={'MAX_ITEMS': 100, 'BATCH_SIZE': 2}):
+            with self.assertNumQueries(2 + 2 * 5):
+                response = self.client.patch('/api/candidates/bulk/', data={
+                    "ids": self.ids[:3] + [999999], "changes": {"age": 40, "gender": "O"},
+                }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["updated"], 3)
+        self.assertEqual(response.json()["results"][-1], {"id": 999999, "status": "not_found"})
+        self.assertEqual(Candidate.objects.filter(age=40, gender="O").count(), 3)
+
+    def test_bulk_update_by_filter_reindexes_names(self):
+        """
+        Test that a filter selects the candidates and renamed candidates are searchable.
+        """
+        response = self.client.patch('/api/candidates/bulk/', data={
+            "filter": {"gender": "F"}, "changes": {"name": "Priya Renamed"},
+        }, format='json')
+        self.assertEqual(response.json()["updated"], 3)
+        search = self.client.get('/api/candidates/search/?q=renamed&page_size=10').json()
+        self.assertEqual(len(search["results"]), 3)
+
+    def test_bulk_update_validation(self):
+        """
+        Test that changes are validated once and invalid requests write nothing.
+        """
+        for data in (
+            {"ids": self.ids, "changes": {"age": 10}},
+            {"ids": self.ids, "changes": {"email": "same@example.com"}},
+            {"ids": self.ids, "changes": {"id": 1}},
+            {"ids": self.ids, "filter": {"gender": "M"}, "changes": {"age": 30}},
+            {"filter": {}, "changes": {"age": 30}},
+        ):
+            response = self.client.patch('/api/candidates/bulk/', data=data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+        self.assertFalse(Candidate.objects.filter(age=30).exists())
+
+        with self.settings(CANDIDATE_BULK={'MAX_ITEMS': 2, 'BATCH_SIZE': 2}):
+            response = self.client.patch('/api/candidates/bulk/', data={"filter": {"age_min": 18}, "changes": {"age": 30}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete(self):
+        """
+        Test deleting by ids and by filter, including the search index and cached results.
+        """
+        self.client.get('/api/candidates/search/?q=Ajay&page_size=10')
+        response = self.client.delete('/api/candidates/bulk/', data={"ids": [self.ids[0], 999999]}, format='json')
+        self.assertEqual(response.json(), {
+            "deleted": 1, "results": [{"id": self.ids[0], "status": "deleted"}, {"id": 999999, "status": "not_found"}],
+        })
+
+        response = self.client.delete('/api/candidates/bulk/', data={"filter": {"gender": "M"}}, format='json')
+        self.assertEqual(response.json()["deleted"], 3)
+        search = self.client.get('/api/candidates/search/?q=Ajay&page_size=10').json()
+        self.assertEqual(len(search["results"]), 2)
+
+
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+
+
+class LoadCandidatesCommandTest(TestCase):
+    def setUp(self):
+        """
+        Create a scratch directory and an existing candidate to deduplicate against.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        Candidate.objects.create(name="Ravi Sharma", age=35, gender="M", email="ravi@example.com", phone_number="1122334455")
+
+    def write(self, name, content):
+        path = Path(self.tmp.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def records(self, count):
+        return [
+            {"name": f"Loaded Candidate{i}", "age": 30, "gender": "M", "email": f"load{i}@example.com", "phone_number": "1234567890"}
+            for i in range(count)
+        ]
+
+    def test_load_ndjson_with_process_pool(self):
+        """
+        Test that valid rows are inserted, duplicates skipped and invalid rows logged.
+        """
+        rows = self.records(5) + [{"name": "Dup", "age": 30, "gender": "M", "email": "ravi@example.com", "phone_number": "1234567890"}]
+        rows[2]["age"] = 12
+        path = self.write("candidates.ndjson", "\n".join(json.dumps(row) for row in rows) + "\nnot json\n")
+        error_log = str(Path(self.tmp.name) / "errors.ndjson")
+
+        call_command("load_candidates", path, batch_size=2, workers=2, error_log=error_log, stdout=StringIO())
+
+        self.assertEqual(Candidate.objects.filter(email__startswith="load").count(), 4)
+        self.assertEqual(Candidate.objects.filter(email="ravi@example.com").count(), 1)
+        logged = [json.loads(line) for line in Path(error_log).read_text().splitlines()]
+        self.assertEqual([entry["record"] for entry in logged], [2, 6])
+
+    def test_load_csv_resumes_from_checkpoint(self):
+        """
+        Test that a CSV load resumes after the records already committed.
+        """
+        rows = self.records(4)
+        header = "name,age,gender,email,phone_number\n"
+        path = self.write("candidates.csv", header + "".join(
+            f"{r['name']},{r['age']},{r['gender']},{r['email']},{r['phone_number']}\n" for r in rows
+        ))
+        checkpoint = self.write("load.checkpoint", "3")
+
+        call_command("load_candidates", path, workers=1, checkpoint=checkpoint, resume=True, stdout=StringIO())
+
+        self.assertEqual(list(Candidate.objects.filter(email__startswith="load").values_list("email", flat=True)), ["load3@example.com"])
+        self.assertEqual(Path(checkpoint).read_text(), "4")
+
+
+class CandidateExportAPITest(TestCase):
+    def setUp(self):
+        """
+        Seed a few candidates to export.
+        """
+        Candidate.objects.create(name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890")
+        Candidate.objects.create(name="Ravi Sharma", age=22, gender="M", email="ravi@example.com", phone_number="1122334455")
+        Candidate.objects.create(name="Ajay Yadav", age=45, gender="M", email="yadav@example.com", phone_number="9988776655")
+
+    def test_export_ndjson(self):
+        """
+        Test that NDJSON export streams one JSON object per candidate in id order.
+        """
+        response = self.client.get('/api/candidates/export/?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            lines = b"".join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r["name"] for r in records], ["Ajay Kumar", "Ravi Sharma", "Ajay Yadav"])
+        self.assertEqual(records[1]["age_category"], "Young")
+
+    def test_export_csv(self):
+        """
+        Test that CSV export has a header row and matches the serializer's categories.
+        """
+        response = self.client.get('/api/candidates/export/?format=csv')
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,name,age,gender,email,phone_number,age_category")
+        self.assertTrue(lines[3].endswith(",Senior"))
+
+    def test_export_filtered_by_search_query(self):
+        """
+        Test that the export can be limited to search matches.
+        """
+        response = self.client.get('/api/candidates/export/?q=Ajay')
+        names = [json.loads(line)["name"] for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(sorted(names), ["Ajay Kumar", "Ajay Yadav"])
+
+    def test_export_invalid_format(self):
+        """
+        Test that an unknown format is rejected with a JSON error.
+        """
+        response = self.client.get('/api/candidates/export/?format=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.json()["error"])
+
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from .serializers import CandidateSerializer
+
+
+class SeedCandidatesCommandTest(TestCase):
+    def test_fast_seed_with_workers(self):
+        """
+        Test that fast seeding inserts unique, valid, searchable candidates and keeps the id sequence usable.
+        """
+        Candidate.objects.create(name="Ravi Sharma", age=35, gender="M", email="ravi@example.com", phone_number="1122334455")
+        call_command("seed_candidates", count=250, batch_size=100, fast=True, workers=2, stdout=StringIO())
+
+        self.assertEqual(Candidate.objects.count(), 251)
+        self.assertEqual(Candidate.objects.values("email").distinct().count(), 251)
+        seeded = Candidate.objects.exclude(email="ravi@example.com").first()
+        self.assertTrue(CandidateSerializer(data={**CandidateSerializer(seeded).data, "email": "fresh@example.com"}).is_valid())
+
+        response = self.client.get('/api/candidates/search/', {"q": seeded.name, "page_size": 100})
+        self.assertIn(seeded.id, [r["id"] for r in response.json()["results"]])
+        Candidate.objects.create(name="After Seed", age=30, gender="F", email="after@example.com", phone_number="1234567890")
+
+    def test_fast_seed_with_spawned_workers(self):
+        """
+        Test that fast seeding works with workers started by spawn, which have to set Django up themselves.
+        """
+        spawn_executor = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn"))
+        with mock.patch("candidates.management.commands.seed_candidates.ProcessPoolExecutor", spawn_executor):
+            call_command("seed_candidates", count=40, batch_size=10, fast=True, workers=2, stdout=StringIO())
+        self.assertEqual(Candidate.objects.count(), 40)
+
+    def test_default_seed_honours_count(self):
+        """
+        Test that the per-row Faker path seeds the requested count.
+        """
+        call_command("seed_candidates", count=15, batch_size=10, stdout=StringIO())
+        self.assertEqual(Candidate.objects.count(), 15)
+
+
+from unittest import mock
+from .cache import get_search_cache
+
+
+class CandidateSearchCacheTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates and start from an empty result cache.
+        """
+        get_search_cache().clear()
+        self.candidate = Candidate.objects.create(
+            name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890"
+        )
+        Candidate.objects.create(name="Ajay Yadav", age=28, gender="M", email="yadav@example.com", phone_number="9988776655")
+
+    def test_repeated_search_served_from_cache(self):
+        """
+        Test that a repeated query, in any case or term order, does not hit the database.
+        """
+        first = self.client.get('/api/candidates/search/?q=Ajay Kumar&page_size=1')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/candidates/search/?q=kumar AJAY&page_size=1')
+        self.assertEqual(first.json()['results'], second.json()['results'])
+        self.assertIn("q=kumar+AJAY", second.json()['next'])
+
+    def test_page_parameters_are_part_of_the_key(self):
+        """
+        Test that different pages are cached separately.
+        """
+        first = self.client.get('/api/candidates/search/?q=Ajay&page_size=1').json()
+        second = self.client.get('/api/candidates/search/?q=Ajay&page_size=1&page=2').json()
+        self.assertNotEqual(first['results'], second['results'])
+
+    def test_cached_page_keeps_requested_count(self):
+        """
+        Test that a cached count=true page still reports the total.
+        """
+        self.client.get('/api/candidates/search/?q=Ajay&page_size=1&count=true')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/candidates/search/?q=Ajay&page_size=1&count=true')
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_writes_invalidate_cached_results(self):
+        """
+        Test that create, update, delete and bulk create are visible immediately.
+        """
+        url = '/api/candidates/search/?q=Ajay'
+        self.client.get(url)
+        self.client.post('/api/candidates/', data={
+            "name": "Ajay Singh", "age": 40, "gender": "M", "email": "singh@example.com", "phone_number": "1122334455"
+        })
+        self.assertEqual(len(self.client.get(url).json()['results']), 3)
+
+        self.client.patch(f'/api/candidates/{self.candidate.id}/', data={"name": "Ravi Kumar"}, content_type="application/json")
+        self.assertEqual(len(self.client.get(url).json()['results']), 2)
+
+        self.client.delete(f'/api/candidates/{self.candidate.id}/')
+        self.client.post('/api/candidates/bulk/', data=[
+            {"name": "Ajay Rao", "age": 33, "gender": "M", "email": "rao@example.com", "phone_number": "1234567890"}
+        ], content_type="application/json")
+        self.assertEqual(len(self.client.get(url).json()['results']), 3)
+
+    @override_settings(CANDIDATE_SEARCH={'BACKEND': 'icontains', 'CACHE': 'candidate_search'})
+    def test_icontains_keys_on_the_raw_query(self):
+        """
+        Test that queries the icontains backend matches differently never share a cache entry.
+        """
+        Candidate.objects.create(name="José Ajay-Rao", age=30, gender="M", email="jose@example.com", phone_number="1234567890")
+        self.assertEqual(len(self.client.get('/api/candidates/search/?q=José').json()['results']), 1)
+        self.assertEqual(self.client.get('/api/candidates/search/?q=Jose').json()['results'], [])
+        self.assertEqual(len(self.client.get('/api/candidates/search/?q=Ajay-Rao').json()['results']), 1)
+        self.assertEqual(len(self.client.get('/api/candidates/search/?q=Ajay Rao').json()['results']), 3)
+
+    def test_bulk_delete_bumps_version_per_statement(self):
+        """
+        Test that bulk deletes bump the cache version a fixed number of times, however
+        many candidates they delete, and still invalidate cached results.
+        """
+        ids = [
+            candidate.id for candidate in Candidate.objects.bulk_create(
+                Candidate(name=f"Ajay {i}", age=30, gender="M", email=f"bulk{i}@example.com", phone_number="1234567890")
+                for i in range(20)
+            )
+        ]
+
+        def count_bumps(data):
+            with mock.patch("candidates.cache.increment_version") as increment_version, \
+                    self.captureOnCommitCallbacks(execute=True):
+                self.client.delete('/api/candidates/bulk/', data=data, content_type="application/json")
+            return increment_version.call_count
+
+        self.assertEqual(count_bumps({"ids": ids[:1]}), count_bumps({"ids": ids[1:]}))
+        self.assertLessEqual(count_bumps({"ids": [self.candidate.id]}), 4)
+
+        url = '/api/candidates/search/?q=Ajay'
+        self.assertEqual(len(self.client.get(url).json()['results']), 1)
+        Candidate.objects.filter(name__startswith="Ajay").delete()
+        self.assertEqual(self.client.get(url).json()['results'], [])
+
+    @override_settings(CANDIDATE_SEARCH={'BACKEND': 'auto', 'CACHE': None})
+    def test_cache_can_be_disabled(self):
+        """
+        Test that searches always query when no cache alias is configured.
+        """
+        self.client.get('/api/candidates/search/?q=Ajay')
+        with self.assertNumQueries(1):
+            self.client.get('/api/candidates/search/?q=Ajay')
+
+
+from django.db.models import F, Value
+from rest_framework.renderers import JSONRenderer
+from .serializers import CandidateReadSerializer
+
+
+class CandidateReadSerializerTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates on both sides of every age category boundary.
+        """
+        for age in (18, 24, 25, 39, 40, 65):
+            Candidate.objects.create(
+                name=f"Age Ünïcode {age}", age=age, gender="O", email=f"age{age}@example.com", phone_number="1234567890"
+            )
+
+    def test_output_is_byte_identical(self):
+        """
+        Test that the fast path renders exactly what CandidateSerializer renders.
+        """
+        queryset = Candidate.objects.order_by('id')
+        expected = JSONRenderer().render(CandidateSerializer(queryset, many=True).data)
+        actual = JSONRenderer().render(CandidateReadSerializer(CandidateReadSerializer.prepare(queryset)).data)
+        self.assertEqual(actual, expected)
+
+    def test_aliases_are_not_selected(self):
+        """
+        Test that alias() entries, as the PostgreSQL backend's search vector, are filtered on but not selected.
+        """
+        queryset = (
+            Candidate.objects.alias(double_age=F("age") * 2).filter(double_age__gte=80)
+            .annotate(relevancy=Value(1)).order_by("id")
+        )
+        rows = list(CandidateReadSerializer.prepare(queryset))
+        self.assertEqual([(row["age"], row["relevancy"]) for row in rows], [(40, 1), (65, 1)])
+        self.assertNotIn("double_age", rows[0])
+
+    def test_search_results_match_model_serializer(self):
+        """
+        Test that search responses carry exactly the CandidateSerializer fields.
+        """
+        results = self.client.get('/api/candidates/search/?q=age&page_size=100').json()['results']
+        expected = CandidateSerializer(Candidate.objects.filter(id__in=[r['id'] for r in results]), many=True).data
+        self.assertEqual(sorted(results, key=lambda r: r['id']), sorted(expected, key=lambda r: r['id']))
+
+
+from recruiter_ats.metrics import registry
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        """
+        Seed a candidate and start from empty aggregated metrics.
+        """
+        registry.reset()
+        self.candidate = Candidate.objects.create(
+            name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890"
+        )
+
+    def test_server_timing_header(self):
+        """
+        Test that responses report total, view, render, db and serializer time plus the query count.
+        """
+        response = self.client.get(f'/api/candidates/{self.candidate.id}/')
+        metrics = [entry.split(';')[0] for entry in response['Server-Timing'].split(', ')]
+        for metric in ("total", "view", "db", "render", "serialize", "queries"):
+            self.assertIn(metric, metrics)
+        self.assertIn('queries;desc="1 queries"', response['Server-Timing'])
+
+    def test_metrics_aggregated_per_url_name(self):
+        """
+        Test that the metrics endpoint exposes histograms per URL name.
+        """
+        with override_settings(CANDIDATE_SEARCH={'BACKEND': 'auto', 'CACHE': None}):
+            self.client.get('/api/candidates/search/?q=Ajay')
+            self.client.get('/api/candidates/search/?q=Kumar')
+
+        search = self.client.get('/metrics/').json()['candidate-search']
+        self.assertEqual(search['requests'], 2)
+        self.assertEqual(search['queries']['buckets']['1'], 2)
+        self.assertEqual(sum(search['total_ms']['buckets'].values()), 2)
+        self.assertIn('serialize_ms', search)
+
+    @override_settings(DEBUG=False, INTERNAL_IPS=[])
+    def test_metrics_endpoint_restricted(self):
+        """
+        Test that the metrics endpoint is hidden from non-internal clients in production.
+        """
+        self.assertEqual(self.client.get('/metrics/').status_code, 404)
+
+
+from django.db.models.functions import Lower
+
+
+class CandidateIndexTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates across genders and ages.
+        """
+        for i, (gender, age) in enumerate([("M", 22), ("F", 31), ("F", 45), ("O", 38), ("F", 27)]):
+            Candidate.objects.create(
+                name=f"Ajay Person{i}", age=age, gender=gender, email=f"person{i}@example.com", phone_number="1234567890"
+            )
+
+    def test_gender_age_filter_uses_composite_index(self):
+        """
+        Test that gender and age range filters are answered from the (gender, age) index.
+        """
+        plan = Candidate.objects.filter(gender="F", age__gte=30, age__lte=40).explain()
+        self.assertIn("candidate_gender_age_idx", plan)
+
+    def test_lower_name_ordering_uses_functional_index(self):
+        """
+        Test that case-insensitive name ordering walks the Lower(name) index instead of sorting.
+        """
+        plan = Candidate.objects.order_by(Lower("name"))[:10].explain()
+        self.assertIn("candidate_name_lower_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_name_ordering_uses_covering_index(self):
+        """
+        Test that the name-ordered listing path walks the (name, id) index instead of sorting.
+        """
+        plan = Candidate.objects.order_by("name", "id")[:10].explain()
+        self.assertIn("candidate_name_covering_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_search_and_list_filters(self):
+        """
+        Test the gender / age_min / age_max parameters on search, list and export.
+        """
+        response = self.client.get('/api/candidates/search/?q=Ajay&gender=F&age_min=28&age_max=45')
+        self.assertEqual(sorted(r['age'] for r in response.json()['results']), [31, 45])
+
+        response = self.client.get('/api/candidates/?gender=F&age_max=30')
+        self.assertEqual([r['age'] for r in response.json()['results']], [27])
+
+        response = self.client.get('/api/candidates/export/?age_min=40')
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 1)
+
+    def test_invalid_filters(self):
+        """
+        Test that unknown genders and inverted age ranges are rejected.
+        """
+        self.assertEqual(self.client.get('/api/candidates/?gender=X').status_code, 400)
+        self.assertEqual(self.client.get('/api/candidates/search/?q=Ajay&age_min=40&age_max=30').status_code, 400)
+
+
+from .models import CandidateNameTrigram
+from .search import edit_similarity, fuzzy_variants
+
+
+class CandidateFuzzySearchTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates whose names are one typo apart from each other.
+        """
+        Candidate.objects.create(name="John Smith", age=30, gender="M", email="john@example.com", phone_number="1234567890")
+        Candidate.objects.create(name="Jonh Smyth", age=35, gender="M", email="jonh@example.com", phone_number="1122334455")
+        Candidate.objects.create(name="Priya Patel", age=28, gender="F", email="priya@example.com", phone_number="5566778899")
+
+    def test_vocabulary_indexed_on_save(self):
+        """
+        Test that saved names add their tokens' trigrams to the vocabulary once.
+        """
+        self.assertEqual(
+            set(CandidateNameTrigram.objects.filter(token="john").values_list("trigram", flat=True)),
+            {"  j", " jo", "joh", "ohn", "hn "},
+        )
+        Candidate.objects.create(name="John Doe", age=40, gender="M", email="john.doe@example.com", phone_number="1234567890")
+        self.assertEqual(CandidateNameTrigram.objects.filter(token="john").count(), 5)
+
+    def test_variants_are_close_known_tokens(self):
+        """
+        Test that misspellings are corrected to known tokens, transpositions included.
+        """
+        self.assertEqual(edit_similarity("smtih", "smith"), 0.8)
+        self.assertEqual([token for token, _ in fuzzy_variants("smtih")], ["smith"])
+        self.assertEqual(fuzzy_variants("john"), [("jonh", 0.75)])
+        self.assertEqual(fuzzy_variants("xyzzy"), [])
+
+    def test_fuzzy_search_matches_misspellings(self):
+        """
+        Test that fuzzy=true finds names the exact search misses.
+        """
+        response = self.client.get('/api/candidates/search/?q=priay')
+        self.assertEqual(response.json()['results'], [])
+        response = self.client.get('/api/candidates/search/?q=priay&fuzzy=true')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["Priya Patel"])
+
+    def test_exact_terms_outrank_corrections(self):
+        """
+        Test that a name containing the query terms exactly ranks above corrected matches.
+        """
+        response = self.client.get('/api/candidates/search/?q=jonh smith&fuzzy=true')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["Jonh Smyth", "John Smith"])
+
+    def test_corrections_match_whole_tokens(self):
+        """
+        Test that a correction never matches longer names it is a prefix of, while the query term still does.
+        """
+        for name in ("Jon Snow", "Ajax Jones", "Jonathan Miller"):
+            Candidate.objects.create(name=name, age=30, gender="M", email=f"{name.split()[1]}@example.com", phone_number="1234567890")
+        self.assertIn(("jon", 0.75), fuzzy_variants("jonh"))
+
+        for backend in ("fts5", "token", "prefix"):
+            with self.subTest(backend=backend), override_settings(CANDIDATE_SEARCH={'BACKEND': backend, 'CACHE': None}):
+                call_command("rebuild_search_index", stdout=StringIO())
+                response = self.client.get('/api/candidates/search/?q=jonh&fuzzy=true&page_size=100')
+                self.assertEqual([r['name'] for r in response.json()['results']], ["Jonh Smyth", "John Smith", "Jon Snow"])
+                response = self.client.get('/api/candidates/search/?q=jo&fuzzy=true&page_size=100')
+                self.assertEqual(len(response.json()['results']), 5)
+
+    @override_settings(CANDIDATE_SEARCH={'BACKEND': 'token'})
+    def test_fuzzy_search_with_token_backend_and_cursor(self):
+        """
+        Test fuzzy matching over the token index with keyset pagination.
+        """
+        call_command("rebuild_search_index", stdout=StringIO())
+        response = self.client.get('/api/candidates/search/?q=jonh&fuzzy=true&pagination=cursor&page_size=1')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["Jonh Smyth"])
+        response = self.client.get(response.json()['next'])
+        self.assertEqual([r['name'] for r in response.json()['results']], ["John Smith"])
+
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+
+
+class AsyncCandidateAPITest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates and an async test client.
+        """
+        self.async_client = AsyncClient()
+        self.candidates = [
+            Candidate.objects.create(
+                name=f"Ajay Async{i}", age=25 + i, gender="M", email=f"async{i}@example.com", phone_number="1234567890"
+            )
+            for i in range(5)
+        ]
+
+    async def test_search_matches_sync_endpoint(self):
+        """
+        Test that the async search returns exactly what the sync endpoint returns.
+        """
+        for params in ("q=Ajay&page=2&page_size=2", "q=Ajay&page_size=2&count=true", "q=Ajay&pagination=cursor&page_size=3"):
+            sync_response = await sync_to_async(self.client.get)(f'/api/candidates/search/?{params}')
+            async_response = await self.async_client.get(f'/api/async/candidates/search/?{params}')
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(
+                async_response.json(),
+                {**sync_response.json(), **{
+                    key: sync_response.json()[key].replace('/api/', '/api/async/')
+                    for key in ('next', 'previous') if sync_response.json().get(key)
+                }},
+            )
+
+    async def test_count_fetched_with_page(self):
+        """
+        Test that count=true returns the total with the page, also when reaching the last page made it known.
+        """
+        response = await self.async_client.get('/api/async/candidates/search/?q=Ajay&page_size=2&count=true')
+        self.assertEqual(response.json()['count'], 5)
+        self.assertEqual(len(response.json()['results']), 2)
+        response = await self.async_client.get('/api/async/candidates/search/?q=Ajay&page_size=2&page=3&count=true')
+        self.assertEqual(response.json()['count'], 5)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    async def test_validation_and_missing_page_errors(self):
+        """
+        Test that errors are formatted like the sync API's.
+        """
+        response = await self.async_client.get('/api/async/candidates/search/?q=123')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], {"q": ["Search query cannot be numeric."]})
+
+        response = await self.async_client.get('/api/async/candidates/search/?q=Ajay&page=9')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_retrieve(self):
+        """
+        Test the async detail endpoint for existing and missing candidates.
+        """
+        response = await self.async_client.get(f'/api/async/candidates/{self.candidates[0].id}/')
+        self.assertEqual(response.json()['email'], "async0@example.com")
+        self.assertEqual(response.json()['age_category'], "Mid-level")
+        self.assertIn("db;dur=", response['Server-Timing'])
+        not_modified = await self.async_client.get(
+            f'/api/async/candidates/{self.candidates[0].id}/', headers={"if-none-match": response['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+        response = await self.async_client.get('/api/async/candidates/999999/')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(CANDIDATE_SEARCH={"BACKEND": "icontains", "CACHE": None, "TIMEOUT": 1e-9})
+    @mock.patch("candidates.utils.SQLITE_PROGRESS_INTERVAL", 1)
+    async def test_slow_query_is_cancelled(self):
+        """
+        Test that a query past the timeout is aborted by the database and reported as 503.
+        """
+        response = await self.async_client.get('/api/async/candidates/search/?q=Ajay')
+        self.assertEqual(response.status_code, 503)
+
+        # The connection is usable again once the timeout is disarmed.
+        count = await Candidate.objects.acount()
+        self.assertEqual(count, 5)
+
+
+class CandidateConditionalRequestTest(TestCase):
+    def setUp(self):
+        """
+        Seed a candidate to revalidate and update conditionally.
+        """
+        get_search_cache().clear()
+        self.candidate = Candidate.objects.create(
+            name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890"
+        )
+        self.url = f'/api/candidates/{self.candidate.id}/'
+
+    def test_detail_validators_and_not_modified(self):
+        """
+        Test that detail responses carry validators and If-None-Match answers 304 with one query.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], f'"{self.candidate.id}-1"')
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_writes_bump_the_version(self):
+        """
+        Test that single and bulk updates change the ETag.
+        """
+        response = self.client.patch(self.url, data={"age": 31}, content_type="application/json")
+        self.assertEqual(response['ETag'], f'"{self.candidate.id}-2"')
+
+        self.client.patch('/api/candidates/bulk/', data={"ids": [self.candidate.id], "changes": {"age": 32}}, content_type="application/json")
+        self.assertEqual(self.client.get(self.url)['ETag'], f'"{self.candidate.id}-3"')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_if_match_makes_writes_conditional(self):
+        """
+        Test that a write with a stale If-Match is refused with 412 and changes nothing.
+        """
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, data={"age": 31}, content_type="application/json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(self.url, data={"age": 45}, content_type="application/json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(self.url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.candidate.refresh_from_db()
+        self.assertEqual((self.candidate.age, self.candidate.version), (31, 2))
+
+    def test_search_weak_etag(self):
+        """
+        Test that searches are revalidated from the table version, without querying candidates.
+        """
+        url = '/api/candidates/search/?q=Ajay'
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertNotEqual(etag, self.client.get(url + '&page_size=5')['ETag'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.client.patch(self.url, data={"age": 31}, content_type="application/json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+from django.conf import settings
+from recruiter_ats.routers import ReplicaRouter
+
+
+@override_settings(DATABASE_ROUTING={**settings.DATABASE_ROUTING, 'REPLICAS': ['replica1']})
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        """
+        Seed a candidate and record the router's read decisions. The recorded
+        replica is never queried, since the test database has no replica alias.
+        """
+        self.candidate = Candidate.objects.create(
+            name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890"
+        )
+        self.reads = []
+        original = ReplicaRouter.db_for_read
+
+        def record_read(router, model, **hints):
+            self.reads.append(original(router, model, **hints))
+            return None
+
+        patcher = mock.patch.object(ReplicaRouter, 'db_for_read', record_read)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_databases(self, url):
+        self.reads.clear()
+        response = self.client.get(url)
+        b"".join(response.streaming_content) if response.streaming else response.content
+        return set(self.reads)
+
+    def test_read_views_use_replicas(self):
+        """
+        Test that search, retrieve and export reads are sent to a replica.
+        """
+        self.assertEqual(self.read_databases('/api/candidates/search/?q=Ajay'), {'replica1'})
+        self.assertEqual(self.read_databases(f'/api/candidates/{self.candidate.id}/'), {'replica1'})
+        self.assertEqual(self.read_databases('/api/candidates/export/'), {'replica1'})
+
+    def test_other_reads_use_primary(self):
+        """
+        Test that views not listed in READ_VIEWS and reads outside requests use the primary.
+        """
+        self.assertEqual(self.read_databases('/api/candidates/'), {None})
+        self.reads.clear()
+        Candidate.objects.count()
+        self.assertEqual(self.reads, [None])
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        """
+        Test read-your-writes: after a write the same client reads from the primary.
+        """
+        response = self.client.patch(
+            f'/api/candidates/{self.candidate.id}/', data={"age": 31}, content_type="application/json"
+        )
+        self.assertIn('db_primary_until', response.cookies)
+        self.assertEqual(self.read_databases('/api/candidates/search/?q=Ajay'), {None})
+
+        self.client.cookies['db_primary_until'] = "0"
+        self.assertEqual(self.read_databases('/api/candidates/search/?q=Kumar'), {'replica1'})
+
+    def test_replicas_are_not_migrated(self):
+        """
+        Test that migrations only run on the primary.
+        """
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate('default', 'candidates'))
+        self.assertFalse(router.allow_migrate('replica1', 'candidates'))
+
+
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+from .utils import retry_on_locked
+
+
+class SQLiteTuningTest(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        """
+        Test that the SQLITE_TUNING pragmas are set on the test database connection.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -64 * 1024)
+            cursor.execute("PRAGMA temp_store")
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+
+
+@override_settings(SQLITE_TUNING={**settings.SQLITE_TUNING, 'LOCK_RETRIES': 2, 'LOCK_RETRY_DELAY': 0})
+class SQLiteLockRetryTest(TransactionTestCase):
+    def flaky_write(self, failures, error="database is locked"):
+        attempts = []
+
+        @retry_on_locked
+        def write():
+            attempts.append(connection.in_atomic_block)
+            Candidate.objects.create(
+                name="Ajay Kumar", age=30, gender="M", email=f"ajay{len(attempts)}@example.com", phone_number="1234567890"
+            )
+            if len(attempts) <= failures:
+                raise OperationalError(error)
+            return len(attempts)
+
+        return write, attempts
+
+    def test_locked_transaction_is_retried(self):
+        """
+        Test that a locked write is rolled back and retried in a fresh transaction.
+        """
+        write, attempts = self.flaky_write(failures=2)
+        self.assertEqual(write(), 3)
+        self.assertEqual(attempts, [True, True, True])
+        self.assertEqual(list(Candidate.objects.values_list("email", flat=True)), ["ajay3@example.com"])
+
+    def test_retries_are_bounded(self):
+        """
+        Test that the error is raised once LOCK_RETRIES is exhausted.
+        """
+        write, attempts = self.flaky_write(failures=3)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(attempts), 3)
+        self.assertFalse(Candidate.objects.exists())
+
+    def test_other_errors_are_not_retried(self):
+        """
+        Test that only "database is locked" errors are retried.
+        """
+        write, attempts = self.flaky_write(failures=1, error="disk I/O error")
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(attempts), 1)
+
+
+from importlib import import_module
+from django.apps import apps
+from .text import search_fields
+
+
+class CandidateSearchNameTest(TestCase):
+    def setUp(self):
+        self.candidate = Candidate.objects.create(
+            name="José García", age=30, gender="M", email="jose@example.com", phone_number="1234567890"
+        )
+
+    def test_search_fields_are_normalized(self):
+        """
+        Test that the search columns hold casefolded, accent-stripped tokens, deduplicated and sorted.
+        """
+        self.assertEqual(search_fields("  ZOË Ångström-Lee zoe "), {"search_tokens": " angstrom lee zoe"})
+        self.assertEqual(self.candidate.search_tokens, " garcia jose")
+
+    def test_search_fields_maintained_on_writes(self):
+        """
+        Test that save, bulk_create and queryset updates keep the search columns in sync.
+        """
+        self.candidate.name = "Renée Dubois"
+        self.candidate.save(update_fields=["name"])
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.search_tokens, " dubois renee")
+
+        created = Candidate.objects.bulk_create([
+            Candidate(name="Łukasz Nowak", age=30, gender="M", email="lukasz@example.com", phone_number="1234567890"),
+        ])
+        self.assertEqual(Candidate.objects.get(pk=created[0].pk).search_tokens, " nowak łukasz")
+
+        response = self.client.patch(
+            "/api/candidates/bulk/", data={"ids": [self.candidate.id], "changes": {"name": "Ana Muñoz"}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.search_tokens, " ana munoz")
+
+    @override_settings(CANDIDATE_SEARCH={'BACKEND': 'prefix', 'CACHE': None})
+    def test_prefix_backend_is_accent_insensitive(self):
+        """
+        Test that the prefix backend matches token prefixes with or without accents, but not inner substrings.
+        """
+        Candidate.objects.create(name="Jose Garcia Lopez", age=30, gender="M", email="lopez@example.com", phone_number="1234567890")
+        response = self.client.get('/api/candidates/search/?q=JOSÉ lop')
+        self.assertEqual([r['name'] for r in response.json()['results']], ["Jose Garcia Lopez", "José García"])
+        response = self.client.get('/api/candidates/search/?q=garc')
+        self.assertEqual(len(response.json()['results']), 2)
+        response = self.client.get('/api/candidates/search/?q=arcia')
+        self.assertEqual(response.json()['results'], [])
+
+    def test_backfill_migration(self):
+        """
+        Test that the chunked backfill fills the search columns of existing rows.
+        """
+        Candidate.objects.bulk_create([
+            Candidate(name=f"Zoë Ångström {i}", age=30, gender="F", email=f"zoe{i}@example.com", phone_number="1234567890")
+            for i in range(3)
+        ])
+        Candidate.objects.update(search_tokens="")
+        migration = import_module("candidates.migrations.0007_candidate_search_name")
+        with mock.patch.object(migration, "BACKFILL_BATCH_SIZE", 2):
+            migration.backfill_search_fields(apps, None)
+
+        self.assertFalse(Candidate.objects.filter(search_tokens="").exists())
+        self.assertEqual(Candidate.objects.filter(search_tokens__endswith=" angstrom zoe").count(), 3)
+        self.assertTrue(CandidateNameTrigram.objects.filter(token="angstrom").exists())
+
+
+from django.contrib.auth.models import User
+from django.test.utils import CaptureQueriesContext
+from .admin import EstimatedCountPaginator
+from .search import rebuild_search_indexes
+from .utils import analyze_table, estimated_row_count
+
+
+class CandidateAdminTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        Candidate.objects.bulk_create([
+            Candidate(name="Ajay Kumar", age=22, gender="M", email="ajay@example.com", phone_number="1234567890"),
+            Candidate(name="José García", age=30, gender="M", email="Jose@Example.com", phone_number="1234567890"),
+            Candidate(name="Ravi Sharma", age=45, gender="M", email="ravi@example.com", phone_number="1234567890"),
+        ])
+        self.url = "/admin/candidates/candidate/"
+
+    def changelist_names(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [candidate.name for candidate in response.context["cl"].result_list]
+
+    def test_search_uses_the_search_index_and_exact_emails(self):
+        """
+        Test that admin search matches name prefixes, accent-insensitively, and exact emails.
+        """
+        self.assertEqual(self.changelist_names({"q": "aja"}), ["Ajay Kumar"])
+        self.assertEqual(self.changelist_names({"q": "jose"}), ["José García"])
+        self.assertEqual(self.changelist_names({"q": " Jose@Example.com "}), ["José García"])
+        self.assertEqual(self.changelist_names({"q": "RAVI@EXAMPLE.COM"}), ["Ravi Sharma"])
+        self.assertEqual(self.changelist_names({"q": "xyz"}), [])
+
+    def test_search_requires_every_term(self):
+        """
+        Test that every term must match, and that phone numbers and partial emails are searchable.
+        """
+        Candidate.objects.create(name="Ravi Kumar", age=30, gender="M", email="rk@corp.example.org", phone_number="5550001111")
+        self.assertEqual(self.changelist_names({"q": "ajay kumar"}), ["Ajay Kumar"])
+        self.assertEqual(self.changelist_names({"q": "kumar"}), ["Ajay Kumar", "Ravi Kumar"])
+        self.assertEqual(self.changelist_names({"q": "555000"}), ["Ravi Kumar"])
+        self.assertEqual(len(self.changelist_names({"q": "1234567890"})), 3)
+        self.assertEqual(self.changelist_names({"q": "corp"}), ["Ravi Kumar"])
+        self.assertEqual(self.changelist_names({"q": "ravi 5550001111"}), ["Ravi Kumar"])
+
+        for backend in ("prefix", "token"):
+            with self.subTest(backend=backend), override_settings(CANDIDATE_SEARCH={"BACKEND": backend, "CACHE": None}):
+                if backend == "token":
+                    rebuild_search_indexes(1000)
+                self.assertEqual(self.changelist_names({"q": "ajay kumar"}), ["Ajay Kumar"])
+                self.assertEqual(self.changelist_names({"q": "555000"}), ["Ravi Kumar"])
+                self.assertEqual(self.changelist_names({"q": "ravi corp"}), ["Ravi Kumar"])
+
+    def test_age_bucket_filter(self):
+        """
+        Test that the age filter uses fixed buckets and never lists distinct ages.
+        """
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.changelist_names({"age_bucket": "mid-level"}), ["José García"])
+        self.assertFalse(any("DISTINCT" in query["sql"] for query in captured))
+        self.assertEqual(self.changelist_names({"age_bucket": "senior", "gender": "M"}), ["Ravi Sharma"])
+
+    def test_estimated_row_count(self):
+        """
+        Test that the estimate comes from the planner statistics once the table is analyzed.
+        """
+        analyze_table(Candidate)
+        self.assertEqual(estimated_row_count(Candidate), 3)
+
+    def test_paginator_uses_estimate_for_unfiltered_large_tables(self):
+        """
+        Test that only unfiltered querysets of large tables are paginated with the estimate.
+        """
+        with mock.patch("candidates.admin.estimated_row_count", return_value=2_000_000):
+            self.assertEqual(EstimatedCountPaginator(Candidate.objects.order_by("name"), 100).count, 2_000_000)
+            self.assertEqual(EstimatedCountPaginator(Candidate.objects.filter(age__gte=40), 100).count, 1)
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(self.url)
+            self.assertContains(response, "2000000 candidates")
+        self.assertFalse(any("COUNT(" in query["sql"] for query in captured))
+        with mock.patch("candidates.admin.estimated_row_count", return_value=None):
+            self.assertEqual(EstimatedCountPaginator(Candidate.objects.all(), 100).count, 3)
+
+
+class CandidateSearchFacetsTest(TestCase):
+    def setUp(self):
+        """
+        Seed candidates in every age category and start from an empty result cache.
+        """
+        get_search_cache().clear()
+        Candidate.objects.bulk_create([
+            Candidate(name="Ajay Kumar", age=22, gender="M", email="ajay@example.com", phone_number="1234567890"),
+            Candidate(name="Ajay Yadav", age=30, gender="M", email="yadav@example.com", phone_number="1234567890"),
+            Candidate(name="Ajay Sharma", age=45, gender="F", email="sharma@example.com", phone_number="1234567890"),
+            Candidate(name="Ravi Kumar", age=35, gender="O", email="ravi@example.com", phone_number="1234567890"),
+        ])
+
+    def test_facets_count_every_match(self):
+        """
+        Test that facets count the whole matched set, not just the page, and list empty values.
+        """
+        response = self.client.get('/api/candidates/search/?q=Ajay&page_size=1&facets=true')
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertEqual(response.json()['facets'], {
+            "gender": {"M": 2, "F": 1, "O": 0},
+            "age_category": {"Young": 1, "Mid-level": 1, "Senior": 1},
+        })
+
+        response = self.client.get('/api/candidates/search/?q=Ajay&gender=M&facets=true')
+        self.assertEqual(response.json()['facets']['age_category'], {"Young": 1, "Mid-level": 1, "Senior": 0})
+        self.assertNotIn('facets', self.client.get('/api/candidates/search/?q=Ajay').json())
+
+    @override_settings(CANDIDATE_SEARCH={**settings.CANDIDATE_SEARCH, "CACHE": None})
+    def test_facets_cost_one_grouped_query(self):
+        """
+        Test that all facets are computed by a single aggregate query next to the page query.
+        """
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get('/api/candidates/search/?q=Ajay&facets=true')
+        self.assertEqual(len(captured), 2)
+        self.assertIn("GROUP BY", captured[1]["sql"])
+
+    def test_facets_cached_for_every_page(self):
+        """
+        Test that facets are cached once per search and shared by its pages until a write.
+        """
+        first = self.client.get('/api/candidates/search/?q=Ajay&page_size=1&facets=true').json()
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/candidates/search/?q=Ajay&page_size=1&page=2&facets=true').json()
+        self.assertEqual(first['facets'], second['facets'])
+        with self.assertNumQueries(0):
+            self.client.get('/api/candidates/search/?q=Ajay&page_size=1&facets=true')
+
+        Candidate.objects.create(name="Ajay Singh", age=60, gender="O", email="singh@example.com", phone_number="1234567890")
+        response = self.client.get('/api/candidates/search/?q=Ajay&page_size=1&facets=true')
+        self.assertEqual(response.json()['facets']['age_category']['Senior'], 2)
+
+    async def test_async_search_facets(self):
+        """
+        Test that the async search view returns the same facets.
+        """
+        response = await AsyncClient().get('/api/async/candidates/search/?q=Ajay&facets=true')
+        self.assertEqual(response.json()['facets']['gender'], {"M": 2, "F": 1, "O": 0})
+
+
+class CandidateBatchGetTest(TestCase):
+    def setUp(self):
+        self.ajay = Candidate.objects.create(name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890")
+        self.priya = Candidate.objects.create(name="Priya Sharma", age=24, gender="F", email="priya@example.com", phone_number="9876543210")
+        self.ravi = Candidate.objects.create(name="Ravi Shankar", age=41, gender="M", email="ravi@example.com", phone_number="1122334455")
+
+    def test_batch_get_by_ids_keeps_request_order(self):
+        """
+        Test that candidates come back in request order, once each, with the unknown ids reported.
+        """
+        ids = [self.ravi.id, 999999, self.ajay.id, self.ravi.id]
+        response = self.client.post('/api/candidates/batch-get/', {"ids": ids}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.ravi.id, self.ajay.id])
+        self.assertEqual(response.json()["results"][0]["age_category"], "Senior")
+        self.assertEqual(response.json()["not_found"], [999999])
+
+    def test_batch_get_by_emails(self):
+        """
+        Test that candidates can be fetched by exact email.
+        """
+        emails = ["priya@example.com", "nobody@example.com", "ajay@example.com"]
+        response = self.client.post('/api/candidates/batch-get/', {"emails": emails}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["name"] for row in response.json()["results"]], ["Priya Sharma", "Ajay Kumar"])
+        self.assertEqual(response.json()["not_found"], ["nobody@example.com"])
+
+    def test_batch_get_validation(self):
+        """
+        Test that exactly one of ids or emails is required, and at most MAX_ITEMS keys.
+        """
+        for payload in ({}, {"ids": [self.ajay.id], "emails": ["ajay@example.com"]}, {"ids": []}, {"ids": [0]}):
+            response = self.client.post('/api/candidates/batch-get/', payload, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+
+        with self.settings(CANDIDATE_BATCH_GET={"MAX_ITEMS": 2, "BATCH_SIZE": 1000}):
+            response = self.client.post('/api/candidates/batch-get/', {"ids": [1, 2, 3]}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("detail", response.json()["error"])
+
+    def test_batch_get_queries_per_batch(self):
+        """
+        Test that the keys are resolved with one query per BATCH_SIZE keys.
+        """
+        ids = [self.ajay.id, self.priya.id, self.ravi.id]
+        with self.settings(CANDIDATE_BATCH_GET={"MAX_ITEMS": 5000, "BATCH_SIZE": 2}):
+            with self.assertNumQueries(2):
+                response = self.client.post('/api/candidates/batch-get/', {"ids": ids}, content_type="application/json")
+        self.assertEqual([row["id"] for row in response.json()["results"]], ids)
+
+
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import CandidateChange
+
+
+class CandidateChangeFeedTest(TestCase):
+    def setUp(self):
+        self.ajay = Candidate.objects.create(name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890")
+        self.priya = Candidate.objects.create(name="Priya Sharma", age=24, gender="F", email="priya@example.com", phone_number="9876543210")
+
+    def changes(self, **params):
+        response = self.client.get('/api/candidates/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    def test_api_writes_recorded_in_order(self):
+        """
+        Test that creates, updates and deletes through the API each append an outbox entry, in order.
+        """
+        since = CandidateChange.objects.latest("sequence").sequence
+        response = self.client.post('/api/candidates/', {
+            "name": "Ravi Shankar", "age": 41, "gender": "M", "email": "ravi@example.com", "phone_number": "1122334455",
+        })
+        ravi_id = response.json()["id"]
+        self.client.patch(f'/api/candidates/{ravi_id}/', {"age": 42}, content_type="application/json")
+        self.client.delete(f'/api/candidates/{ravi_id}/')
+
+        changes = self.changes(since=since)
+        self.assertEqual([change["operation"] for change in changes], ["create", "update", "delete"])
+        self.assertEqual({change["candidate_id"] for change in changes}, {ravi_id})
+        self.assertEqual(changes[1]["data"]["age"], 42)
+        self.assertEqual(changes[1]["data"]["version"], 2)
+        self.assertIsNone(changes[2]["data"])
+        self.assertLess(changes[0]["sequence"], changes[1]["sequence"])
+
+    def test_bulk_writes_recorded(self):
+        """
+        Test that the bulk create, update and delete paths record one entry per candidate.
+        """
+        since = CandidateChange.objects.latest("sequence").sequence
+        created = self.client.post('/api/candidates/bulk/', data=[
+            {"name": f"Bulk {index}", "age": 30, "gender": "F", "email": f"bulk{index}@example.com", "phone_number": "1234567890"}
+            for index in range(3)
+        ], content_type="application/json").json()["ids"]
+        self.client.patch('/api/candidates/bulk/', data={"ids": created, "changes": {"age": 50}}, content_type="application/json")
+        self.client.delete('/api/candidates/bulk/', data={"ids": created[:2]}, content_type="application/json")
+
+        changes = self.changes(since=since)
+        self.assertEqual([change["operation"] for change in changes], ["create"] * 3 + ["update"] * 3 + ["delete"] * 2)
+        self.assertEqual([change["data"]["age"] for change in changes[3:6]], [50, 50, 50])
+        self.assertEqual([change["candidate_id"] for change in changes[6:]], created[:2])
+
+    def test_entries_roll_back_with_the_write(self):
+        """
+        Test that outbox entries share the transaction of the change, and that queryset
+        updates record the candidates they matched even when the update unmatches them.
+        """
+        before = CandidateChange.objects.count()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Candidate.objects.create(name="Ravi Shankar", age=41, gender="M", email="ravi@example.com", phone_number="1122334455")
+            raise RuntimeError
+        self.assertEqual(CandidateChange.objects.count(), before)
+
+        Candidate.objects.filter(gender="F").update(gender="O")
+        change = CandidateChange.objects.latest("sequence")
+        self.assertEqual((change.candidate_id, change.data["gender"]), (self.priya.id, "O"))
+
+    def test_changes_since_and_limit(self):
+        """
+        Test that the feed resumes after `since`, honours `limit` and validates both.
+        """
+        first, second = CandidateChange.objects.order_by("sequence").values_list("sequence", flat=True)
+        self.assertEqual([change["sequence"] for change in self.changes()], [first, second])
+        self.assertEqual([change["candidate_id"] for change in self.changes(since=first)], [self.priya.id])
+        self.assertEqual([change["sequence"] for change in self.changes(limit=1)], [first])
+        self.assertEqual(self.changes(since=second), [])
+
+        self.assertEqual(self.client.get('/api/candidates/changes/?since=-1').status_code, 400)
+        with self.settings(CANDIDATE_CHANGES={**settings.CANDIDATE_CHANGES, "MAX_PAGE_SIZE": 10}):
+            self.assertEqual(self.client.get('/api/candidates/changes/?limit=11').status_code, 400)
+
+    def test_compaction_and_retention(self):
+        """
+        Test that compaction keeps the latest old change per candidate and recent
+        changes, and that deletion entries are purged after retention.
+        """
+        self.ajay.age = 31
+        self.ajay.save()
+        self.priya.delete()
+        CandidateChange.objects.update(created_at=timezone.now() - timedelta(days=30))
+        self.ajay.age = 32
+        self.ajay.save()
+        self.ajay.age = 33
+        self.ajay.save()
+
+        call_command("compact_candidate_changes", batch_size=1, stdout=StringIO())
+
+        remaining = list(CandidateChange.objects.order_by("sequence").values_list("candidate_id", "operation", "data__age"))
+        # The old create and first update of Ajay are superseded; the recent updates are kept.
+        self.assertEqual(remaining, [(self.ajay.id, "update", 32), (self.ajay.id, "update", 33)])
+
+    def test_fast_seed_recorded(self):
+        """
+        Test that a consumer reading the feed from 0 sees every candidate seeded through the raw fast path.
+        """
+        call_command("seed_candidates", count=25, batch_size=10, fast=True, stdout=StringIO())
+
+        changes = self.changes(since=0)
+        self.assertEqual([change["operation"] for change in changes], ["create"] * 27)
+        self.assertEqual([change["candidate_id"] for change in changes], list(Candidate.objects.order_by("id").values_list("id", flat=True)))
+        seeded = Candidate.objects.latest("id")
+        self.assertEqual(changes[-1]["data"], seeded.change_snapshot())
+
+    def test_backfill_migration(self):
+        """
+        Test that the migration records a 'create' change for every existing candidate.
+        """
+        CandidateChange.objects.all().delete()
+        migration = import_module("candidates.migrations.0008_candidatechange")
+        with mock.patch.object(migration, "BACKFILL_BATCH_SIZE", 1):
+            migration.record_existing_candidates(apps, None)
+
+        self.assertEqual(
+            [(change["candidate_id"], change["operation"], change["data"]["email"]) for change in self.changes(since=0)],
+            [(self.ajay.id, "create", "ajay@example.com"), (self.priya.id, "create", "priya@example.com")],
+        )
+
+
+from .jobs import HANDLERS, claim_job, requeue_stale_jobs, run_job
+from .models import CandidateJob
+
+
+class CandidateJobTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.import_dir = Path(self.tmp.name) / "imports"
+        self.import_dir.mkdir()
+        job_settings = override_settings(CANDIDATE_JOBS={
+            **settings.CANDIDATE_JOBS, "IMPORT_DIR": self.import_dir, "FILES_DIR": Path(self.tmp.name) / "files",
+        })
+        job_settings.enable()
+        self.addCleanup(job_settings.disable)
+        Candidate.objects.create(name="Ajay Kumar", age=30, gender="M", email="ajay@example.com", phone_number="1234567890")
+        Candidate.objects.create(name="Priya Sharma", age=24, gender="F", email="priya@example.com", phone_number="9876543210")
+        Candidate.objects.create(name="Ravi Shankar", age=51, gender="M", email="ravi@example.com", phone_number="1122334455")
+
+    def submit(self, kind, params=None):
+        response = self.client.post('/api/candidates/jobs/', {"kind": kind, "params": params or {}}, content_type="application/json")
+        self.assertEqual(response.status_code, 202, response.content)
+        return CandidateJob.objects.get(pk=response.json()["id"])
+
+
+class CandidateJobTest(CandidateJobTestMixin, TestCase):
+    def test_submit_and_poll(self):
+        """
+        Test that jobs are queued with validated parameters and polled by their Location.
+        """
+        response = self.client.post('/api/candidates/jobs/', {"kind": "bulk_delete", "params": {"filter": {"gender": "M"}}}, content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        poll = self.client.get(response["Location"]).json()
+        self.assertEqual((poll["status"], poll["progress"], poll["params"]), ("queued", 0, {"filter": {"gender": "M"}}))
+
+        for payload in (
+            {"kind": "unknown"},
+            {"kind": "bulk_delete", "params": {}},
+            {"kind": "bulk_delete", "params": {"filter": {}}},
+            {"kind": "export", "params": {"format": "xml"}},
+            {"kind": "import", "params": {"path": "missing.ndjson"}},
+            {"kind": "import", "params": {"path": "../outside.ndjson"}},
+        ):
+            response = self.client.post('/api/candidates/jobs/', payload, content_type="application/json")
+            self.assertEqual(response.status_code, 400, payload)
+
+    def test_claimed_job_runs_with_progress(self):
+        """
+        Test that a claimed bulk delete runs in batches, reports progress and records its result.
+        """
+        job = self.submit("bulk_delete", {"filter": {"gender": "M"}})
+        with self.settings(CANDIDATE_JOBS={**settings.CANDIDATE_JOBS, "BATCH_SIZE": 1}):
+            claimed = claim_job("worker-1")
+            self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, "running", 1))
+            job = run_job(claimed, "worker-1")
+
+        self.assertEqual((job.status, job.progress, job.total, job.result), ("succeeded", 2, 2, {"deleted": 2}))
+        self.assertEqual(list(Candidate.objects.values_list("name", flat=True)), ["Priya Sharma"])
+        self.assertEqual(CandidateChange.objects.filter(operation="delete").count(), 2)
+        self.assertIsNone(claim_job("worker-1"))
+
+    def test_retries_and_kind_limits(self):
+        """
+        Test that failed jobs are retried with backoff until MAX_ATTEMPTS, and that
+        kinds at their concurrency limit are not claimed.
+        """
+        job = self.submit("reindex")
+        with mock.patch.dict(HANDLERS, {"reindex": mock.Mock(side_effect=RuntimeError("boom"))}):
+            job = run_job(claim_job("worker-1"), "worker-1")
+            self.assertEqual((job.status, job.attempts, job.error), ("queued", 1, "RuntimeError: boom"))
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIsNone(claim_job("worker-1"))
+
+            CandidateJob.objects.filter(pk=job.pk).update(run_after=timezone.now(), attempts=2)
+            job = run_job(claim_job("worker-1"), "worker-1")
+            self.assertEqual((job.status, job.attempts), ("failed", 3))
+
+        running = self.submit("reindex")
+        claim_job("worker-1")
+        self.submit("reindex")
+        export = self.submit("export")
+        # The second reindex waits for the running one; the export does not.
+        self.assertEqual(claim_job("worker-2").pk, export.pk)
+        self.assertIsNone(claim_job("worker-2"))
+        self.assertEqual(CandidateJob.objects.get(pk=running.pk).status, "running")
+
+    def test_cancellation(self):
+        """
+        Test that queued jobs are cancelled at once, running ones at their next
+        progress report, and finished ones not at all.
+        """
+        queued = self.submit("export")
+        response = self.client.delete(f'/api/candidates/jobs/{queued.pk}/')
+        self.assertEqual((response.status_code, response.json()["status"]), (202, "cancelled"))
+        self.assertEqual(self.client.delete(f'/api/candidates/jobs/{queued.pk}/').status_code, 409)
+
+        job = self.submit("bulk_delete", {"ids": [1, 2, 3]})
+        claimed = claim_job("worker-1")
+
+        def cancel_midway(job, context):
+            self.client.delete(f'/api/candidates/jobs/{job.pk}/')
+            context.report(1, 3)
+            raise AssertionError("Not cancelled.")
+
+        with mock.patch.dict(HANDLERS, {"bulk_delete": cancel_midway}):
+            job = run_job(claimed, "worker-1")
+        self.assertEqual((job.status, job.progress), ("cancelled", 1))
+        self.assertEqual(Candidate.objects.count(), 3)
+
+    def test_jobs_of_lost_workers_requeued(self):
+        """
+        Test that running jobs without a recent heartbeat are requeued, and that
+        the lost worker can no longer record their outcome.
+        """
+        job = self.submit("export")
+        claim_job("worker-1")
+        CandidateJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+
+        job = CandidateJob.objects.get(pk=job.pk)
+        self.assertEqual((job.status, job.worker, job.error), ("queued", "", "Worker lost."))
+        self.assertEqual(run_job(job, "worker-1").status, "queued")
+
+
+class CandidateWorkerCommandTest(CandidateJobTestMixin, TransactionTestCase):
+    def test_worker_runs_jobs_in_pool(self):
+        """
+        Test that the worker runs the queued import and export in its pool, and that
+        the export file can be downloaded.
+        """
+        (self.import_dir / "new.ndjson").write_text(json.dumps({
+            "name": "Meera Nair", "age": 33, "gender": "F", "email": "meera@example.com", "phone_number": "5566778899",
+        }) + "\n")
+        imported = self.submit("import", {"path": "new.ndjson"})
+        exported = self.submit("export", {"format": "ndjson", "gender": "M"})
+
+        # One thread, woken by job completion: the shared in-memory test database
+        # locks whole tables across connections instead of waiting for them.
+        call_command("run_candidate_worker", burst=True, concurrency=1, poll_interval=30, stdout=StringIO())
+
+        imported.refresh_from_db()
+        exported.refresh_from_db()
+        self.assertEqual((imported.status, imported.result["inserted"], imported.progress), ("succeeded", 1, 1))
+        self.assertEqual((exported.status, exported.result["rows"]), ("succeeded", 2))
+        self.assertTrue(Candidate.objects.filter(email="meera@example.com").exists())
+
+        response = self.client.get(f'/api/candidates/jobs/{exported.pk}/result/')
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row["name"] for row in rows], ["Ajay Kumar", "Ravi Shankar"])
+        response.close()
+        self.assertEqual(self.client.get(f'/api/candidates/jobs/{imported.pk}/result/').status_code, 404)
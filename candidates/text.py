@@ -0,0 +1,36 @@
+"""
+Text normalization shared by the candidate model and the search indexes.
+"""
+import re
+import unicodedata
+
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """
+    Casefolds text and strips its accents, so that 'José', 'JOSE' and 'jose' compare equal.
+    """
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    Splits text into normalized word tokens.
+    """
+    return TOKEN_RE.findall(normalize(text))
+
+
+def search_fields(name):
+    """
+    Returns the precomputed search columns of a candidate name: `search_tokens`
+    holds its distinct tokens sorted, each preceded by a space, so that ' term'
+    occurs in it exactly when one of the tokens starts with the term.
+    """
+    tokens = tokenize(name)
+    return {
+        'search_tokens': ''.join(f' {token}' for token in sorted(set(tokens))),
+    }
+
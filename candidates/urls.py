@@ -1,8 +1,22 @@
 from django.urls import path
-from .views import CandidateCreateView, CandidateUpdateDeleteView, CandidateSearchView
+from .views import (
+    AsyncCandidateRetrieveView, AsyncCandidateSearchView, CandidateBatchGetView, CandidateBulkView, CandidateChangesView,
+    CandidateCreateView, CandidateExportView, CandidateJobCreateView, CandidateJobDetailView, CandidateJobResultView,
+    CandidateUpdateDeleteView, CandidateSearchView,
+)
 
 urlpatterns = [
     path('candidates/', CandidateCreateView.as_view(), name='candidate-list-create'),
+    path('candidates/bulk/', CandidateBulkView.as_view(), name='candidate-bulk'),
+    path('candidates/batch-get/', CandidateBatchGetView.as_view(), name='candidate-batch-get'),
+    path('candidates/changes/', CandidateChangesView.as_view(), name='candidate-changes'),
+    path('candidates/export/', CandidateExportView.as_view(), name='candidate-export'),
+    path('candidates/jobs/', CandidateJobCreateView.as_view(), name='candidate-job-create'),
+    path('candidates/jobs/<int:pk>/', CandidateJobDetailView.as_view(), name='candidate-job-detail'),
+    path('candidates/jobs/<int:pk>/result/', CandidateJobResultView.as_view(), name='candidate-job-result'),
     path('candidates/<int:pk>/', CandidateUpdateDeleteView.as_view(), name='candidate-update-delete'),
     path('candidates/search/', CandidateSearchView.as_view(), name='candidate-search'),
+    # Async variants, for ASGI deployments.
+    path('async/candidates/<int:pk>/', AsyncCandidateRetrieveView.as_view(), name='candidate-retrieve-async'),
+    path('async/candidates/search/', AsyncCandidateSearchView.as_view(), name='candidate-search-async'),
 ]
\ No newline at end of file
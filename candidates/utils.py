@@ -1,5 +1,12 @@
+import functools
+import time
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
 from rest_framework.views import exception_handler
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import APIException, ValidationError
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction
 from django.http import JsonResponse
 
 
@@ -32,4 +39,157 @@ def format_error_response(message, status=400):
     """
     Returns a standardized error response format.
     """
-    return {"error": message, "status": status}
\ No newline at end of file
+    return {"error": message, "status": status}
+
+
+
+# Cancelling a background job that already finished
+class JobFinished(APIException):
+    status_code = 409
+    default_detail = "The job already finished."
+    default_code = "job_finished"
+
+
+# Query timeouts for the async views
+class QueryTimeout(APIException):
+    status_code = 503
+    default_detail = "The query took too long. Narrow it down and try again."
+    default_code = "query_timeout"
+
+
+# SQLite VM instructions between two deadline checks.
+SQLITE_PROGRESS_INTERVAL = 1000
+
+
+def _set_query_deadline(deadline, state):
+    """
+    Arms (or with `deadline=None`, disarms) the database-side timeout on this
+    thread's connection. SQLite aborts from a progress handler, PostgreSQL
+    through `statement_timeout`; other databases are not bounded.
+    """
+    connection.ensure_connection()
+    if connection.vendor == 'sqlite':
+        def check_deadline():
+            state['timed_out'] = time.monotonic() > deadline
+            return state['timed_out']
+
+        connection.connection.set_progress_handler(
+            check_deadline if deadline is not None else None, SQLITE_PROGRESS_INTERVAL
+        )
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            if deadline is None:
+                cursor.execute("RESET statement_timeout")
+            else:
+                cursor.execute("SET statement_timeout = %s", [max(1, int((deadline - time.monotonic()) * 1000))])
+
+
+@asynccontextmanager
+async def query_timeout(seconds):
+    """
+    Bounds the async ORM queries run in the block to `seconds` (None for no
+    limit). The database itself aborts the running statement, so a timed-out
+    request leaves no query behind; the block then raises QueryTimeout.
+    Async ORM calls of one request share a thread and so a connection, which
+    is where the timeout is armed.
+    """
+    if seconds is None:
+        yield
+        return
+
+    state = {'timed_out': False}
+    await sync_to_async(_set_query_deadline)(time.monotonic() + seconds, state)
+    try:
+        yield
+    except OperationalError as exc:
+        # psycopg reports a statement_timeout as SQLSTATE 57014 (query_canceled).
+        if state['timed_out'] or getattr(exc.__cause__, 'sqlstate', None) == '57014':
+            raise QueryTimeout() from exc
+        raise
+    finally:
+        await sync_to_async(_set_query_deadline)(None, state)
+
+
+
+# SQLite tuning
+def apply_sqlite_pragmas(connection):
+    """
+    Applies `SQLITE_TUNING['PRAGMAS']` to a freshly opened SQLite connection.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_TUNING', {}).get('PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def is_database_locked(exc):
+    return isinstance(exc, OperationalError) and 'database is locked' in str(exc)
+
+
+def retry_on_locked(func):
+    """
+    Runs `func` in a transaction and, on SQLite, retries the whole transaction
+    with a doubling delay when it fails with "database is locked", up to
+    `SQLITE_TUNING['LOCK_RETRIES']` times. Inside an outer transaction `func`
+    is simply called, since only the outermost transaction can be retried.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            return func(*args, **kwargs)
+        tuning = getattr(settings, 'SQLITE_TUNING', {})
+        retries = tuning.get('LOCK_RETRIES', 0)
+        delay = tuning.get('LOCK_RETRY_DELAY', 0.05)
+
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as exc:
+                if attempt == retries or not is_database_locked(exc):
+                    raise
+            time.sleep(delay * 2 ** attempt)
+
+    return wrapper
+
+
+
+# Planner statistics
+def analyze_table(model, using=DEFAULT_DB_ALIAS):
+    """
+    Refreshes the planner statistics of a model's table, e.g. after a bulk load.
+    They also back `estimated_row_count`.
+    """
+    db = connections[using]
+    if db.vendor not in ('sqlite', 'postgresql'):
+        return
+    with db.cursor() as cursor:
+        cursor.execute(f"ANALYZE {db.ops.quote_name(model._meta.db_table)}")
+
+
+def estimated_row_count(model, using=DEFAULT_DB_ALIAS):
+    """
+    Returns the planner's estimate of a model's row count, read from `sqlite_stat1`
+    or `pg_class.reltuples` instead of scanning the table. Returns None when the
+    table was never analyzed or the database keeps no such estimate.
+    """
+    db = connections[using]
+    table = model._meta.db_table
+    with db.cursor() as cursor:
+        if db.vendor == 'sqlite':
+            try:
+                # Every row of a table starts with its row count, followed by per-index figures.
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            except OperationalError:
+                # sqlite_stat1 only exists once something was analyzed.
+                return None
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+        if db.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            # reltuples is -1 until the table is first vacuumed or analyzed.
+            return row[0] if row and row[0] >= 0 else None
+    return None
@@ -1,35 +1,58 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
 
 # Create your views here.
 from rest_framework import generics, views, status
 from rest_framework.response import Response
-from django.db.models import Q, Case, When, Value, IntegerField, Sum
-from functools import reduce
-from operator import or_
-from django.db.models.functions import Lower
-from .models import Candidate
+from .models import Candidate, CandidateChange, CandidateJob
 from .serializers import CandidateSerializer
-from .pagination import CandidatePagination
-from rest_framework.exceptions import ValidationError, NotFound
+from .pagination import CandidateKeysetPagination, CandidateSearchKeysetPagination, CandidateSearchPagination
+from rest_framework.exceptions import APIException, ValidationError, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
 from .serializers import CandidateSearchSerializer
-from .pagination import CandidatePagination
 from .models import Candidate
-from .serializers import CandidateSerializer
-from .utils import format_error_response
+from .serializers import (
+    CandidateBatchGetSerializer, CandidateBulkCreateSerializer, CandidateChangesSerializer, CandidateBulkDeleteSerializer, CandidateBulkUpdateSerializer, CandidateExportSerializer,
+    CandidateFilterSerializer, CandidateJobSerializer, CandidateReadSerializer, CandidateSerializer, age_category,
+)
+from .utils import JobFinished, custom_exception_handler, format_error_response, query_timeout, retry_on_locked
+from .search import fuzzy_search, get_search_backend
+from .cache import facets_cache_key, get_candidates_version, get_search_cache, search_cache_key, search_etag
     
-from django.db.models import F, Value, IntegerField, ExpressionWrapper
+from django.db.models import F, ExpressionWrapper
 from django.db.models.functions import Concat
 
 
 
 
-class CandidateCreateView(generics.CreateAPIView):
+class CandidateCreateView(generics.ListCreateAPIView):
     """
-      create a single candidate.
+      create a single candidate, or list all candidates in id order with keyset pagination.
     """
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
+    pagination_class = CandidateKeysetPagination
+
+    def get_queryset(self):
+        """
+        Applies the gender / age_min / age_max filters to the listing.
+        """
+        filter_serializer = CandidateFilterSerializer(data=self.request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        return CandidateFilterSerializer.filter_queryset(super().get_queryset(), filter_serializer.validated_data)
 
+    @retry_on_locked
     def create(self, request, *args, **kwargs):
         """
         Override create method to handle single candidate creation.
@@ -42,72 +65,520 @@ class CandidateCreateView(generics.CreateAPIView):
 
 
 
+class CandidateBulkView(generics.GenericAPIView):
+    """
+    API View to create, update or delete many candidates in one request.
+    """
+    queryset = Candidate.objects.all()
+    serializer_class = CandidateBulkCreateSerializer
+    serializer_classes = {
+        "PATCH": CandidateBulkUpdateSerializer,
+        "DELETE": CandidateBulkDeleteSerializer,
+    }
+
+    def get_serializer_class(self):
+        return self.serializer_classes.get(self.request.method, self.serializer_class)
+
+    @retry_on_locked
+    def post(self, request, *args, **kwargs):
+        """
+        Validate a JSON array of candidates and insert them all, or report errors per row.
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=settings.CANDIDATE_BULK["MAX_ITEMS"]
+        )
+        serializer.is_valid(raise_exception=True)
+        candidates = serializer.save()
+        return Response(
+            {"created": len(candidates), "ids": [candidate.pk for candidate in candidates]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def patch(self, request, *args, **kwargs):
+        """
+        Apply one set of changes to the candidates selected by `ids` or `filter`.
+        """
+        return self.write(request, "updated")
+
+    def delete(self, request, *args, **kwargs):
+        """
+        Delete the candidates selected by `ids` or `filter`.
+        """
+        return self.write(request, "deleted")
+
+    @retry_on_locked
+    def write(self, request, outcome):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({outcome: sum(result["status"] == outcome for result in results), "results": results})
+
+
+
+
+class CandidateBatchGetView(views.APIView):
+    """
+    API View to fetch many candidates by id or email in one request, instead of
+    one detail request per candidate.
+    """
+    def post(self, request):
+        """
+        Return the candidates found in request order, and the ids or emails matching none.
+        """
+        serializer = CandidateBatchGetSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rows, not_found = serializer.resolve()
+        return Response({"results": CandidateReadSerializer(rows).data, "not_found": not_found})
+
+
 class CandidateUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     """
     API View to retrieve, update, and delete a candidate.
+    Responses carry ETag and Last-Modified validators: If-None-Match and
+    If-Modified-Since answer 304 without serializing, and If-Match and
+    If-Unmodified-Since make writes conditional (412 when the candidate changed).
     """
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in ("GET", "HEAD", "OPTIONS"):
+            # Writes lock the row, so a precondition still holds when the write is saved.
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        not_modified = self.evaluate_preconditions(request, instance)
+        if not_modified is not None:
+            return not_modified
+        return self.add_validators(Response(self.get_serializer(instance).data), instance)
+
+    @retry_on_locked
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        with transaction.atomic():
+            instance = self.get_object()
+            precondition_failed = self.evaluate_preconditions(request, instance)
+            if precondition_failed is not None:
+                return precondition_failed
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            self.perform_update(serializer)
+        return self.add_validators(Response(serializer.data), serializer.instance)
+
+    @retry_on_locked
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            instance = self.get_object()
+            precondition_failed = self.evaluate_preconditions(request, instance)
+            if precondition_failed is not None:
+                return precondition_failed
+            self.perform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def evaluate_preconditions(self, request, instance):
+        """
+        Returns the 304 or 412 response the conditional request headers call for, if any.
+        """
+        response = get_conditional_response(
+            request, etag=instance.etag, last_modified=int(instance.updated_at.timestamp())
+        )
+        return self.add_validators(response, instance) if response is not None else None
+
+    def add_validators(self, response, instance):
+        response["ETag"] = instance.etag
+        response["Last-Modified"] = http_date(instance.updated_at.timestamp())
+        return response
+
 
     
 
 
 
-class CandidateSearchView(views.APIView):
+class CandidateSearchMixin:
     """
-    API View to search candidates with relevancy sorting.
+    Search steps shared by the sync and async candidate search views.
     """
-    def get(self, request):
-        # Step 1: Validate query parameters
+    def validate_search(self, request):
+        """
+        Validates the query parameters; returns them and the paginator they select.
+        """
         search_serializer = CandidateSearchSerializer(data=request.query_params)
         search_serializer.is_valid(raise_exception=True)
         validated_data = search_serializer.validated_data
+        if validated_data.get("pagination") == "cursor":
+            paginator = CandidateSearchKeysetPagination()
+        else:
+            paginator = CandidateSearchPagination()
+        return validated_data, paginator
+
+    def check_not_modified(self, request, validated_data, version):
+        """
+        Returns the search's ETag, and the 304 response when the client's copy is current (else None).
+        """
+        etag = search_etag(validated_data, version)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+        return etag, not_modified
+
+    def restore_cached_page(self, request, paginator, cached):
+        """
+        Restores the paginator from a cache entry and returns the cached results.
+        """
+        paginator.restore_page_state(request, cached["page"])
+        return cached["results"]
+
+    def cache_entry(self, paginator, results):
+        return {"page": paginator.get_page_state(), "results": results}
+
+    def get_matches(self, query, validated_data):
+        """
+        Returns the ranked candidates matching the query and the filters.
+        """
+        return CandidateFilterSerializer.filter_queryset(
+            self.perform_search(query, fuzzy=validated_data.get("fuzzy", False)), validated_data
+        )
 
-        # Extract query, page, and page_size separately
+    def perform_search(self, query, fuzzy=False):
+        """
+        Handles search and relevancy scoring logic for candidates.
+        """
+
+        if not query:
+            return Candidate.objects.none()
+
+        if fuzzy:
+            return fuzzy_search(query)
+
+        return get_search_backend().search(query)
+
+
+class CandidateSearchView(CandidateSearchMixin, views.APIView):
+    """
+    API View to search candidates with relevancy sorting.
+    """
+    def get(self, request):
+        # Step 1: Validate query parameters
+        validated_data, paginator = self.validate_search(request)
         query = validated_data.get("q", "").strip()
-        page = validated_data.get("page")
-        page_size = validated_data.get("page_size")
 
+        # Step 2: Answer revalidations and repeated searches without querying candidates
+        version = get_candidates_version()
+        etag, not_modified = self.check_not_modified(request, validated_data, version)
+        if not_modified is not None:
+            return not_modified
 
-        # Step 2: Perform search and relevancy filtering
-        queryset = self.perform_search(query)
+        queryset = None
+        search_cache = get_search_cache()
+        cached = None
+        if search_cache is not None:
+            cache_key = search_cache_key(validated_data, version)
+            cached = search_cache.get(cache_key)
 
-        # Step 3: Apply pagination
-        paginator = CandidatePagination()
-        paginated_queryset = paginator.paginate_queryset(queryset, request)
+        if cached is not None:
+            results = self.restore_cached_page(request, paginator, cached)
+        else:
+            # Step 3: Perform search and relevancy filtering
+            queryset = self.get_matches(query, validated_data)
 
-        # Step 4: Serialize and return the results
-        serializer = CandidateSerializer(paginated_queryset, many=True)
-        return paginator.get_paginated_response(serializer.data)
+            # Step 4: Apply pagination (one query per page; counting is opt-in)
+            paginated_rows = paginator.paginate_queryset(CandidateReadSerializer.prepare(queryset), request)
 
+            # Step 5: Serialize and cache the results
+            results = CandidateReadSerializer(paginated_rows).data
+            if search_cache is not None:
+                search_cache.set(cache_key, self.cache_entry(paginator, results))
 
+        # Step 6: Add the facet counts when requested, and return the results
+        response = paginator.get_paginated_response(results, headers={"ETag": etag})
+        if validated_data.get("facets"):
+            response.data["facets"] = self.get_facets(query, validated_data, version, search_cache, queryset)
+        return response
 
-    def perform_search(self, query):
+    def get_facets(self, query, validated_data, version, search_cache, queryset=None):
         """
-        Handles search and relevancy scoring logic for candidates.
+        Returns the number of matches per gender and age category, counted by one
+        grouped query and cached for every page of the search.
         """
+        if search_cache is not None:
+            cache_key = facets_cache_key(validated_data, version)
+            facets = search_cache.get(cache_key)
+            if facets is not None:
+                return facets
 
-        if not query:
-            return Candidate.objects.none()
+        if queryset is None:
+            queryset = self.get_matches(query, validated_data)
+        facets = CandidateSearchSerializer.fold_facets(CandidateSearchSerializer.facet_queryset(queryset))
+        if search_cache is not None:
+            search_cache.set(cache_key, facets)
+        return facets
 
-        search_terms = query.split()
-        # Build relevancy conditions for each term
-        conditions = [
-            Case(
-                When(name__icontains=term, then=Value(1)),
-                default=Value(0),
-                output_field=IntegerField(),
-            )
-            for term in search_terms
-        ]
-
-        # Calculate relevancy score by summing up the conditions
-        relevancy_annotation = sum(conditions)
-              # Apply threshold: return empty queryset if no results meet the relevancy threshold
-        queryset =Candidate.objects.annotate(relevancy=relevancy_annotation)
-        if not queryset.filter(relevancy__gte=1).exists():
-            return Candidate.objects.none()
-        queryset = queryset.filter(relevancy__gte=1).order_by('-relevancy')
 
-        return queryset
+
+
+class Echo:
+    """
+    File-like object whose write() hands the written value back, so csv.writer
+    can format rows one at a time for a streaming response.
+    """
+    def write(self, value):
+        return value
+
+
+class CandidateExportView(views.APIView):
+    """
+    API View to stream every candidate, or every search match, as NDJSON or CSV.
+    """
+    fields = ['id', 'name', 'age', 'gender', 'email', 'phone_number']
+    chunk_size = 2000
+
+    def perform_content_negotiation(self, request, force=False):
+        # `format` selects the export format here, not a DRF renderer.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        export_serializer = CandidateExportSerializer(data=request.query_params)
+        export_serializer.is_valid(raise_exception=True)
+        validated_data = export_serializer.validated_data
+
+        queryset = self.get_queryset(validated_data)
+        # Rows are streamed after the middleware returned, so pick the read database now.
+        queryset = queryset.using(queryset.db)
+        rows = self.get_rows(queryset)
+
+        if validated_data["format"] == "csv":
+            content, content_type = self.stream_csv(rows), 'text/csv'
+        else:
+            content, content_type = self.stream_ndjson(rows), 'application/x-ndjson'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="candidates.{validated_data["format"]}"'
+        return response
+
+    def get_queryset(self, validated_data):
+        """
+        Returns every candidate by id, or every search match by relevancy, filtered.
+        """
+        query = validated_data.get("q", "").strip()
+        if query:
+            queryset = CandidateSearchView().perform_search(query)
+        else:
+            queryset = Candidate.objects.order_by('id')
+        return CandidateFilterSerializer.filter_queryset(queryset, validated_data)
+
+    def get_rows(self, queryset):
+        # Plain tuples straight from the cursor: no model instances, no serializer.
+        return queryset.values_list(*self.fields).iterator(chunk_size=self.chunk_size)
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            record = dict(zip(self.fields, row))
+            record['age_category'] = age_category(record['age'])
+            yield json.dumps(record) + '\n'
+
+    def stream_csv(self, rows):
+        writer = csv.writer(Echo())
+        age_index = self.fields.index('age')
+        yield writer.writerow(self.fields + ['age_category'])
+        for row in rows:
+            yield writer.writerow(row + (age_category(row[age_index]),))
+
+
+
+
+class CandidateChangesView(views.APIView):
+    """
+    API View to stream the candidate change feed as NDJSON: every create, update
+    and delete recorded in the outbox after `since`, in sequence order. Consumers
+    apply the changes as upserts and deletions, then poll again with the
+    sequence of the last line they read.
+    """
+    fields = ['sequence', 'candidate_id', 'operation', 'data', 'created_at']
+    chunk_size = 1000
+
+    def get(self, request):
+        changes_serializer = CandidateChangesSerializer(data=request.query_params)
+        changes_serializer.is_valid(raise_exception=True)
+        validated_data = changes_serializer.validated_data
+        limit = validated_data.get("limit", settings.CANDIDATE_CHANGES["PAGE_SIZE"])
+
+        queryset = CandidateChange.objects.filter(sequence__gt=validated_data["since"]).order_by("sequence")
+        # Rows are streamed after the middleware returned, so pick the read database now.
+        queryset = queryset.using(queryset.db)
+        rows = queryset[:limit].values_list(*self.fields).iterator(chunk_size=self.chunk_size)
+        return StreamingHttpResponse(self.stream_ndjson(rows), content_type='application/x-ndjson')
+
+    def stream_ndjson(self, rows):
+        for row in rows:
+            record = dict(zip(self.fields, row))
+            record['created_at'] = record['created_at'].isoformat()
+            yield json.dumps(record) + '\n'
+
+
+
+
+class CandidateJobCreateView(generics.CreateAPIView):
+    """
+    API View to queue a background job (import, export, reindex or bulk delete)
+    for `run_candidate_worker`.
+    """
+    queryset = CandidateJob.objects.all()
+    serializer_class = CandidateJobSerializer
+
+    def create(self, request, *args, **kwargs):
+        """
+        Queue the job and answer 202 with its status URL.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        return Response(
+            serializer.data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": reverse("candidate-job-detail", args=[job.pk])},
+        )
+
+
+class CandidateJobDetailView(generics.RetrieveDestroyAPIView):
+    """
+    API View to poll a background job's status and progress, or cancel it (DELETE).
+    """
+    queryset = CandidateJob.objects.all()
+    serializer_class = CandidateJobSerializer
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Cancel a queued job, or ask its worker to stop a running one.
+        """
+        job = self.get_object()
+        if not job.cancel():
+            raise JobFinished(f"The job already {job.status}.")
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class CandidateJobResultView(views.APIView):
+    """
+    API View to download the file written by a succeeded export job.
+    """
+    def get(self, request, pk):
+        try:
+            job = CandidateJob.objects.get(pk=pk, kind=CandidateJob.EXPORT, status=CandidateJob.SUCCEEDED)
+        except CandidateJob.DoesNotExist:
+            raise NotFound("No finished export job matches the given query.")
+        content_type = 'text/csv' if job.result["format"] == "csv" else 'application/x-ndjson'
+        return FileResponse(
+            open(job.result["path"], 'rb'),
+            as_attachment=True,
+            filename=f'candidates.{job.result["format"]}',
+            content_type=content_type,
+        )
+
+
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's APIView, which only runs sync handlers.
+    Wraps the request for DRF parsers and paginators, renders with DRF's
+    JSONRenderer and formats API exceptions with the project's exception handler.
+    """
+    renderer = JSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            response = custom_exception_handler(exc, {"view": self, "request": request})
+            return self.render(response.data, status=response.status_code)
+
+    def render(self, data, status=200, headers=None):
+        return HttpResponse(
+            self.renderer.render(data), status=status, content_type="application/json", headers=headers
+        )
+
+
+class AsyncCandidateSearchView(CandidateSearchMixin, AsyncAPIView):
+    """
+    Async variant of the candidate search API, for ASGI deployments: queries run
+    through the async ORM and are cancelled by the database once they exceed
+    CANDIDATE_SEARCH['TIMEOUT'].
+    """
+    async def get(self, request):
+        # Step 1: Validate query parameters
+        validated_data, paginator = self.validate_search(request)
+        query = validated_data.get("q", "").strip()
+
+        # Step 2: Answer revalidations and repeated searches without querying candidates
+        version = await sync_to_async(get_candidates_version)()
+        etag, not_modified = self.check_not_modified(request, validated_data, version)
+        if not_modified is not None:
+            return not_modified
+
+        queryset = None
+        search_cache = get_search_cache()
+        cached = None
+        if search_cache is not None:
+            cache_key = search_cache_key(validated_data, version)
+            cached = await search_cache.aget(cache_key)
+
+        if cached is not None:
+            data = self.restore_cached_page(request, paginator, cached)
+        else:
+            async with query_timeout(settings.CANDIDATE_SEARCH.get("TIMEOUT")):
+                # Step 3: Perform search and relevancy filtering (fuzzy search queries its vocabulary)
+                queryset = await sync_to_async(self.get_matches)(query, validated_data)
+
+                # Step 4: Fetch the page, then the count when requested
+                paginated_rows = await paginator.apaginate_queryset(CandidateReadSerializer.prepare(queryset), request)
+
+            # Step 5: Serialize and cache the results
+            data = CandidateReadSerializer(paginated_rows).data
+            if search_cache is not None:
+                await search_cache.aset(cache_key, self.cache_entry(paginator, data))
+
+        # Step 6: Add the facet counts when requested, and return the results
+        data = paginator.get_paginated_data(data)
+        if validated_data.get("facets"):
+            data["facets"] = await self.get_facets(query, validated_data, version, search_cache, queryset)
+        return self.render(data, headers={"ETag": etag})
+
+    async def get_facets(self, query, validated_data, version, search_cache, queryset=None):
+        """
+        Async `CandidateSearchView.get_facets()`.
+        """
+        if search_cache is not None:
+            cache_key = facets_cache_key(validated_data, version)
+            facets = await search_cache.aget(cache_key)
+            if facets is not None:
+                return facets
+
+        async with query_timeout(settings.CANDIDATE_SEARCH.get("TIMEOUT")):
+            if queryset is None:
+                queryset = await sync_to_async(self.get_matches)(query, validated_data)
+            rows = [row async for row in CandidateSearchSerializer.facet_queryset(queryset)]
+        facets = CandidateSearchSerializer.fold_facets(rows)
+        if search_cache is not None:
+            await search_cache.aset(cache_key, facets)
+        return facets
+
+
+class AsyncCandidateRetrieveView(AsyncAPIView):
+    """
+    Async variant of the candidate detail API (read-only).
+    """
+    async def get(self, request, pk):
+        async with query_timeout(settings.CANDIDATE_SEARCH.get("TIMEOUT")):
+            try:
+                candidate = await Candidate.objects.aget(pk=pk)
+            except Candidate.DoesNotExist:
+                raise NotFound("No Candidate matches the given query.")
+
+        detail_view = CandidateUpdateDeleteView()
+        not_modified = detail_view.evaluate_preconditions(request, candidate)
+        if not_modified is not None:
+            return not_modified
+        return detail_view.add_validators(self.render(CandidateSerializer(candidate).data), candidate)
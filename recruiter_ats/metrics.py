@@ -0,0 +1,238 @@
+"""
+Per-request timing instrumentation for recruiter_ats.
+
+RequestMetricsMiddleware records, for every request, the wall time, the time
+spent in the view and in rendering, the database time and query count (through
+connection execute wrappers, so DEBUG is not needed) and any named timings
+recorded with `timer()`, such as serializer time. They are reported in a
+`Server-Timing` header and aggregated per URL name into in-process histograms
+served by `metrics_view`. The middleware runs natively under both WSGI and
+ASGI.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, JsonResponse
+
+
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, float('inf'))
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Timings collected for a single request. Also acts as the database execute wrapper.
+    """
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.view_finished_at = None
+        self.rendered_at = None
+        self.finished_at = None
+        self.db_time = 0.0
+        self.queries = 0
+        self.timings = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started_at
+            self.queries += 1
+
+    def record(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    def durations_ms(self):
+        """
+        Returns every recorded duration in milliseconds, keyed by Server-Timing metric name.
+        """
+        finished_at = self.finished_at or time.perf_counter()
+        view_finished_at = self.view_finished_at or finished_at
+        durations = {
+            'total': finished_at - self.started_at,
+            'view': view_finished_at - self.started_at,
+            'db': self.db_time,
+        }
+        if self.rendered_at is not None:
+            durations['render'] = self.rendered_at - view_finished_at
+        durations.update(self.timings)
+        return {name: duration * 1000 for name, duration in durations.items()}
+
+    def server_timing(self):
+        return ', '.join(
+            f'{name};dur={duration:.3f}' for name, duration in self.durations_ms().items()
+        ) + f', queries;desc="{self.queries} queries"'
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection: times the query into the
+    current request's metrics. The context variable follows the request into
+    the threads running async ORM calls, which use their own connections.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument_connection(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(instrument_connection)
+
+
+@contextmanager
+def timer(name):
+    """
+    Adds the time spent in the block to the current request's `name` timing.
+    Does nothing outside of a request handled by RequestMetricsMiddleware.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(name, time.perf_counter() - started_at)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: `counts[i]` is the number of observations <= `buckets[i]`
+    that did not fit an earlier bucket.
+    """
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+
+    def as_dict(self):
+        return {
+            'buckets': {
+                ('+Inf' if bound == float('inf') else str(bound)): count
+                for bound, count in zip(self.buckets, self.counts)
+            },
+            'sum': round(self.sum, 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, in-process aggregation of request metrics per URL name.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, route, metrics):
+        durations = metrics.durations_ms()
+        with self.lock:
+            histograms = self.routes.setdefault(route, {'requests': 0, 'queries': Histogram(QUERY_BUCKETS)})
+            histograms['requests'] += 1
+            histograms['queries'].observe(metrics.queries)
+            for name, duration in durations.items():
+                histograms.setdefault(f'{name}_ms', Histogram(LATENCY_BUCKETS_MS)).observe(duration)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                route: {
+                    name: value if isinstance(value, int) else value.as_dict()
+                    for name, value in histograms.items()
+                }
+                for route, histograms in self.routes.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request and reports it in a `Server-Timing` header and in `registry`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened later are instrumented by the connection_created signal.
+        for connection in connections.all():
+            instrument_connection(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        metrics.finished_at = time.perf_counter()
+        response['Server-Timing'] = metrics.server_timing()
+        resolver_match = getattr(request, 'resolver_match', None)
+        registry.observe(resolver_match.url_name if resolver_match and resolver_match.url_name else 'unresolved', metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Marks the end of the view; DRF responses are rendered after this hook.
+        """
+        metrics = _current_metrics.get()
+        metrics.view_finished_at = time.perf_counter()
+
+        def mark_rendered(rendered_response):
+            metrics.rendered_at = time.perf_counter()
+
+        response.add_post_render_callback(mark_rendered)
+        return response
+
+
+def metrics_view(request):
+    """
+    Serves the aggregated request metrics, in DEBUG or to INTERNAL_IPS only.
+    """
+    if not (settings.DEBUG or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS):
+        raise Http404
+    return JsonResponse(registry.snapshot())
@@ -0,0 +1,122 @@
+"""
+Primary/replica database routing for recruiter_ats.
+
+Writes always go to the `default` (primary) database. Reads go to one of
+`DATABASE_ROUTING['REPLICAS']` only while ReplicaRoutingMiddleware serves a
+GET or HEAD request to one of `DATABASE_ROUTING['READ_VIEWS']`; every other
+read uses the primary. A client that wrote gets a cookie pinning its reads to
+the primary for `STICKY_SECONDS`, so it reads its own writes despite
+replication lag.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+_current_routing = ContextVar('database_routing', default=None)
+
+
+def get_routing_settings():
+    return getattr(settings, 'DATABASE_ROUTING', {})
+
+
+class RequestRouting:
+    """
+    Routing state of a single request, shared with the threads running its ORM calls.
+    """
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """
+    Sends replica-eligible reads to a random replica and everything else to the primary.
+    """
+    def db_for_read(self, model, **hints):
+        routing = _current_routing.get()
+        replicas = get_routing_settings().get('REPLICAS', [])
+        if routing is not None and routing.use_replica and not routing.wrote and replicas:
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        routing = _current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas receive the schema through replication (or `refresh_replicas` locally).
+        return db not in get_routing_settings().get('REPLICAS', [])
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decides per request whether reads may use a replica, and pins clients that
+    wrote to the primary for `STICKY_SECONDS` through a cookie.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        routing = RequestRouting()
+        token = _current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_routing.reset(token)
+        return self.finish(response, routing)
+
+    async def __acall__(self, request):
+        routing = RequestRouting()
+        token = _current_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_routing.reset(token)
+        return self.finish(response, routing)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = _current_routing.get()
+        routing_settings = get_routing_settings()
+        routing.use_replica = (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.url_name in routing_settings.get('READ_VIEWS', [])
+            and not self.is_pinned(request)
+        )
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES[get_routing_settings().get('STICKY_COOKIE', 'db_primary_until')]) > time.time()
+        except (KeyError, ValueError):
+            return False
+
+    def finish(self, response, routing):
+        routing_settings = get_routing_settings()
+        sticky_seconds = routing_settings.get('STICKY_SECONDS', 0)
+        if routing.wrote and sticky_seconds:
+            response.set_cookie(
+                routing_settings.get('STICKY_COOKIE', 'db_primary_until'),
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
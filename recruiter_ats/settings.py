@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +28,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Clients allowed to read the request metrics endpoint when DEBUG is off.
+INTERNAL_IPS = ['127.0.0.1']
+
 
 # Application definition
 
@@ -42,6 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so that its wall time covers every other middleware.
+    'recruiter_ats.metrics.RequestMetricsMiddleware',
+    'recruiter_ats.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +81,74 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'candidates.utils.custom_exception_handler',
 }
 
+# Candidate search
+# 'auto' picks 'fts5' (SQLite) or 'postgres' from the default database engine and falls
+# back to 'token', which ranks with the CandidateNameToken inverted index; switching to it
+# from another backend requires `manage.py rebuild_search_index`. 'prefix' matches token
+# prefixes of the precomputed normalized name and 'icontains' raw substrings, both by scanning.
+
+CANDIDATE_SEARCH = {
+    'BACKEND': 'auto',
+    # Cache alias for search result pages, or None to disable result caching.
+    'CACHE': 'candidate_search',
+    # Seconds after which the database cancels an async search or retrieve query, or None.
+    'TIMEOUT': 5,
+}
+
+# Bulk candidate writes: the most rows accepted per request, and rows per INSERT statement.
+
+CANDIDATE_BULK = {
+    'MAX_ITEMS': 10000,
+    'BATCH_SIZE': 1000,
+}
+
+# Batch candidate lookups: the most ids or emails accepted per request, and keys per query.
+
+CANDIDATE_BATCH_GET = {
+    'MAX_ITEMS': 5000,
+    'BATCH_SIZE': 1000,
+}
+
+# Candidate change feed (transactional outbox): default and maximum entries per
+# `GET /api/candidates/changes/` response, and entries per INSERT/DELETE batch.
+# `compact_candidate_changes` drops entries superseded by a later change of the
+# same candidate once they are COMPACT_AFTER_HOURS old, and deletion entries once
+# they are RETENTION_DAYS old: consumers lagging further behind must resync.
+
+CANDIDATE_CHANGES = {
+    'PAGE_SIZE': 1000,
+    'MAX_PAGE_SIZE': 10000,
+    'BATCH_SIZE': 1000,
+    'COMPACT_AFTER_HOURS': 24,
+    'RETENTION_DAYS': 7,
+}
+
+# Background candidate jobs (`run_candidate_worker`): worker threads, running jobs
+# allowed per kind across all workers, attempts per job, base retry delay in seconds
+# (doubled per attempt), queue polling interval, seconds without a heartbeat after
+# which a running job's worker counts as lost, rows per batch, validation processes
+# of imports, the directory imports are read from and the one job files go to.
+
+CANDIDATE_JOBS = {
+    'CONCURRENCY': int(os.environ.get('CANDIDATE_WORKER_CONCURRENCY', 2)),
+    'KIND_CONCURRENCY': {'import': 1, 'reindex': 1},
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 30,
+    'POLL_INTERVAL': 1.0,
+    'HEARTBEAT_TIMEOUT': 300,
+    'BATCH_SIZE': 2000,
+    'IMPORT_WORKERS': 1,
+    'IMPORT_DIR': BASE_DIR / 'imports',
+    'FILES_DIR': BASE_DIR / 'job_files',
+}
+
+# Candidate admin: unfiltered changelists of tables with at least this many rows (per the
+# planner statistics) show the estimated row count instead of running COUNT(*).
+
+CANDIDATE_ADMIN = {
+    'ESTIMATED_COUNT_MIN': 10000,
+}
+
 WSGI_APPLICATION = 'recruiter_ats.wsgi.application'
 
 
@@ -84,9 +159,89 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a connection is reused across requests (0 closes it after every request).
+        # Prefer 0 plus a connection pooler under ASGI, where each request may get a new thread.
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+        # Check a reused connection before the first query of a request.
+        'CONN_HEALTH_CHECKS': os.environ.get('DATABASE_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+        'OPTIONS': {
+            # Writers take the write lock when their transaction begins, so they wait on
+            # the busy timeout instead of failing when a read has to become a write.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Applied to every new SQLite connection by candidates.signals.
+SQLITE_TUNING = {
+    'PRAGMAS': {
+        # Readers keep reading while a candidate is written, and commits append to the log.
+        'journal_mode': 'wal',
+        # Durable across application crashes in WAL mode; a power loss may drop the last commits.
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+        # Negative values are KiB: a 64 MiB page cache per connection.
+        'cache_size': -64 * 1024,
+        'temp_store': 'memory',
+        # Milliseconds a statement waits for a lock before "database is locked".
+        'busy_timeout': 5000,
+    },
+    # Write transactions still failing with "database is locked" are retried this many
+    # times, waiting LOCK_RETRY_DELAY seconds and doubling it on every attempt.
+    'LOCK_RETRIES': 3,
+    'LOCK_RETRY_DELAY': 0.05,
+}
+
+# Read replicas, e.g. DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3: comma-separated
+# database names sharing the primary's other settings. SQLite files stand in for replicas
+# locally; copy the primary into them with `manage.py refresh_replicas`.
+for index, name in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], 'NAME': name.strip(), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['recruiter_ats.routers.ReplicaRouter']
+
+DATABASE_ROUTING = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    # URL names whose GET/HEAD requests may read from a replica.
+    'READ_VIEWS': [
+        'candidate-search',
+        'candidate-search-async',
+        'candidate-update-delete',
+        'candidate-retrieve-async',
+        'candidate-export',
+        # Replicas hold a consistent prefix of the outbox, so a lagging one only delays changes.
+        'candidate-changes',
+    ],
+    # After a write, the client reads from the primary for this long (read-your-writes).
+    'STICKY_SECONDS': int(os.environ.get('DATABASE_STICKY_SECONDS', 5)),
+    'STICKY_COOKIE': 'db_primary_until',
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# locmem is per process; point 'candidate_search' at a shared backend (Redis, Memcached)
+# when running several workers so that write invalidation reaches all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'candidate_search': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'candidate-search',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+
+# candidate_name_covering_idx INCLUDEs non-key columns on PostgreSQL; SQLite builds it as a
+# plain (name, id) index, which is still what the name-ordered listing needs.
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
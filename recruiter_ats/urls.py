@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('candidates.urls')),
+    path('metrics/', metrics_view, name='request-metrics'),
 ]
\ No newline at end of file